@@ -11,25 +11,104 @@ class Settings(BaseSettings):
     # App settings
     APP_NAME: str = "News Chatbot"
     DEBUG: bool = False
+    WARMUP_ON_STARTUP: bool = True  # Load models and open stores before serving
+    PRELOAD_MODELS: bool = False  # Load weights at import, to share them across forked workers
     REDIS_URL: str = "redis://localhost:6379"
     REDIS_DB: int = 0
+    REDIS_MAX_CONNECTIONS: int = 50  # Shared async connection pool size per worker
+    REDIS_SOCKET_TIMEOUT: float = 5.0  # seconds
+    REDIS_CONNECT_TIMEOUT: float = 2.0  # seconds
     SESSION_TTL: int = 86400  # 24 hours in seconds
+    SESSION_MAX_MESSAGES: int = 40  # Recent messages kept verbatim per session
+    SESSION_ENCODING: str = "json"  # "json" or "msgpack" for stored messages
+    SESSION_SUMMARY_MAX_LINES: int = 20  # Rolling summary lines for trimmed messages
+    SESSION_SUMMARY_LINE_CHARS: int = 160
     CHROMA_PATH: str = "./chroma_db"
+    DATA_DIR: str = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'scripts'))
     COLLECTION_NAME: str = "news_articles"
+    VECTOR_STORE: str = "chroma"  # "chroma" or "numpy" (memory-mapped, shared across workers)
+    NUMPY_STORE_DIR: str = "vector_store"  # Under DATA_DIR
+    NUMPY_IVF_LISTS: int = 0  # IVF coarse clusters built after ingestion (0 = brute force)
+    NUMPY_IVF_NPROBE: int = 8  # IVF clusters scanned per query
+    NUMPY_QUANTIZATION: str = "none"  # "none" or "int8" (scan int8 codes, re-score in float32)
+    NUMPY_RESCORE_CANDIDATES: int = 100  # Quantized shortlist re-scored at full precision
+    VECTOR_PARTITION: str = "none"  # "none", "day" or "week": one collection per period
+    VECTOR_PARTITION_WORKERS: int = 8  # Partitions queried in parallel
+    VECTOR_PARTITION_QUERY_DAYS: int = 30  # Partitions searched when a query sets no start date (0 = all)
     
     EMBEDDING_MODEL: ClassVar[str] = "all-MiniLM-L6-v2"
-    CHUNK_SIZE: int = 1000  # Size of text chunks for embedding
-    CHUNK_OVERLAP: int = 200  # Overlap between chunks
+    EMBEDDING_BACKEND: str = "torch"  # "torch" (SentenceTransformer) or "onnx" (ONNX Runtime)
+    EMBEDDING_ONNX_QUANTIZE: bool = False  # Serve the dynamically int8-quantized ONNX graph
+    EMBEDDING_ONNX_DIR: str = "onnx_models"  # Exported graphs, under DATA_DIR
+    EMBEDDING_THREADS: int = 0  # Intra-op threads per process for either backend (0 = runtime default)
+    CHUNK_SIZE: int = 200  # Max tokens per chunk; keep under the model's 256 word-piece limit
+    CHUNK_OVERLAP: int = 40  # Tokens of trailing sentences repeated in the next chunk
+    EMBEDDING_CACHE_SIZE: int = 10000  # Query embeddings kept in-process (LRU)
+    EMBEDDING_CACHE_TTL: int = 3600  # seconds
+    EMBEDDING_CACHE_REDIS: bool = False  # Share cached query embeddings across workers via Redis
+    EMBEDDING_BATCH_SIZE: int = 64  # Texts per model.encode forward pass
+    EMBEDDING_COALESCE_ENABLED: bool = True  # Micro-batch concurrent query embeddings
+    EMBEDDING_COALESCE_MAX_BATCH: int = 32  # Queries per coalesced encode
+    EMBEDDING_COALESCE_WAIT_MS: float = 5.0  # Max time a query waits for its batch to fill
+    INGEST_BATCH_SIZE: int = 256  # Chunks gathered per bulk ChromaDB write
+    INGEST_WORKERS: int = 0  # Embedding worker processes (0/1 = in-process)
+    INGEST_POLL_MIN_SECONDS: int = 120  # Fastest per-feed polling interval of the ingestion daemon
+    INGEST_POLL_MAX_SECONDS: int = 1800  # Slowest interval a quiet feed backs off to
+    INGEST_QUEUE_SIZE: int = 256  # Articles buffered between daemon stages
+    INGEST_EXTRACT_TASKS: int = 8  # Concurrent extract/chunk tasks in the daemon
+    INGEST_FLUSH_SECONDS: float = 5.0  # Max wait to fill an embedding batch
+    INGEST_DRAIN_SECONDS: int = 60  # Grace period for queued work on shutdown
+    INGEST_MAINTENANCE_SECONDS: int = 3600  # Retention pruning and index optimize interval
+    INGEST_CHECKPOINT_FILE: str = "ingest_checkpoint.json"  # Daemon state, under DATA_DIR
+    HYBRID_SEARCH: bool = True  # Fuse BM25 keyword hits with vector hits
+    HYBRID_CANDIDATES: int = 20  # Candidates taken from each retriever before fusion
+    RRF_K: int = 60  # Reciprocal rank fusion damping constant
+    RERANK_ENABLED: bool = False  # Re-score over-fetched candidates with a cross-encoder
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 50  # Candidates over-fetched for re-ranking
+    RERANK_BATCH_SIZE: int = 16
+    RERANK_BUDGET_MS: int = 150  # Per-query re-ranking time budget
+    RECENCY_HALF_LIFE_HOURS: float = 0.0  # Age at which the recency boost halves; 0 disables it
+    RECENCY_WEIGHT: float = 0.3  # Share of a candidate's score that decays with age
+    CONTEXT_MAX_TOKENS: int = 1000  # Prompt context budget after merging and sentence selection
+    CONTEXT_DUPLICATE_THRESHOLD: float = 0.95  # Chunk embedding cosine above which a passage is a repeat
+    SEARCH_CANDIDATES: int = 100  # Chunks ranked per search query before grouping by article
+    SEARCH_MAX_PAGE_SIZE: int = 50
+    SEARCH_CACHE_SIZE: int = 256  # Ranked result lists kept for paging
+    SEARCH_CACHE_TTL: int = 300  # seconds
+    LEXICAL_INDEX_FILE: str = "lexical_index.sqlite3"  # BM25 index, under DATA_DIR
+    DEDUP_ENABLED: bool = True  # Collapse near-duplicate articles before embedding
+    DEDUP_THRESHOLD: float = 0.8  # Min estimated shingle Jaccard similarity for a near-duplicate
+    ARTICLE_RETENTION_DAYS: int = 30  # Drop articles first ingested longer ago (0 = keep forever)
     
     GEMINI_API_KEY: Optional[str] = None
-    GEMINI_MODEL: str = "gemini-pro"
+    GEMINI_MODEL: str = "gemini-1.5-flash"
+    GENERATION_BACKEND: str = "gemini"  # "gemini" or "stub" (offline, deterministic)
+    STUB_LATENCY_MS: int = 300  # Stub backend delay before the first token
+    STUB_TOKENS_PER_SECOND: float = 50.0  # Stub backend token rate (0 = no delay)
+    STUB_MAX_TOKENS: int = 120
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_THRESHOLD: float = 0.95  # Min cosine similarity between queries for a cache hit
+    ANSWER_CACHE_SIZE: int = 2048  # Distinct retrieved-chunk sets kept
+    ANSWER_CACHE_TTL: int = 900  # seconds
     
     NEWS_SOURCES: List[str] = [
     "https://www.aljazeera.com/xml/rss/all.xml",
+    "http://rss.cnn.com/rss/edition.rss",  # Fallback RSS feed
 ]
     
     REQUEST_TIMEOUT: int = 10  # seconds
+    FEED_MAX_CONNECTIONS: int = 100  # Pooled connections shared by all feed fetches
+    FEED_PER_HOST_LIMIT: int = 4  # Concurrent requests per feed host
+    FEED_STATE_FILE: str = "feed_state.json"  # ETag/Last-Modified per feed, under DATA_DIR
     MAX_ARTICLES_PER_SOURCE: int = 50
+    ARTICLE_FULL_TEXT: bool = False  # Fetch linked pages and index the extracted article body
+    ARTICLE_FETCH_CONCURRENCY: int = 64  # Article pages in flight at once
+    ARTICLE_PER_DOMAIN_LIMIT: int = 4  # Concurrent page requests per domain
+    ARTICLE_DOMAIN_INTERVAL_MS: int = 100  # Min spacing between request starts per domain
+    ARTICLE_PARSE_WORKERS: int = 0  # HTML parser processes (0 = one per CPU)
+    ARTICLE_CACHE_DIR: str = "page_cache"  # Raw article HTML, under DATA_DIR
+    ARTICLE_CACHE_TTL: int = 21600  # seconds before a cached page is revalidated
     
     # CORS
     CORS_ORIGINS: List[str] = ["*"]
@@ -1,5 +1,14 @@
-# Database package initialization
-from .redis_client import redis_client
-from .chroma_client import chroma_client
+# Database package initialization. Clients are resolved on first access so
+# importing the package does not connect to Redis or open ChromaDB.
+from .vector_store import VectorStore, get_vector_store
 
-__all__ = ["redis_client", "chroma_client"]
\ No newline at end of file
+__all__ = ["redis_client", "chroma_client", "VectorStore", "get_vector_store"]
+
+def __getattr__(name):
+    if name == "redis_client":
+        from .redis_client import redis_client
+        return redis_client
+    if name == "chroma_client":
+        from .chroma_client import get_chroma_client
+        return get_chroma_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
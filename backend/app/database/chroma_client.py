@@ -1,15 +1,33 @@
-import chromadb
 import os
+import threading
 from backend.app.utils.logger import logger
 
-# Configure ChromaDB with persistence
-try:
-    # Ensure the path is absolute and points to scripts/chroma_db
-    chroma_db_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'scripts', 'chroma_db'))
-    # Create the directory if it doesn't exist
-    os.makedirs(chroma_db_path, exist_ok=True)
-    chroma_client = chromadb.PersistentClient(path=chroma_db_path)
-    logger.info(f"ChromaDB client initialized successfully with persistence path: {chroma_db_path}")
-except Exception as e:
-    logger.error(f"Failed to initialize ChromaDB client: {e}")
-    raise
\ No newline at end of file
+# Ensure the path is absolute and points to scripts/chroma_db
+chroma_db_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'scripts', 'chroma_db'))
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_chroma_client():
+    """Open the persistent ChromaDB client on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                try:
+                    import chromadb
+                    # Create the directory if it doesn't exist
+                    os.makedirs(chroma_db_path, exist_ok=True)
+                    _client = chromadb.PersistentClient(path=chroma_db_path)
+                    logger.info(f"ChromaDB client initialized successfully with persistence path: {chroma_db_path}")
+                except Exception as e:
+                    logger.error(f"Failed to initialize ChromaDB client: {e}")
+                    raise
+    return _client
+
+def __getattr__(name):
+    # Keeps ``from chroma_client import chroma_client`` working without
+    # connecting at import time
+    if name == "chroma_client":
+        return get_chroma_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
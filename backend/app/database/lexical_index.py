@@ -0,0 +1,97 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import List, Optional, Sequence, Tuple
+from backend.app.config import settings
+from backend.app.utils.logger import logger
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his how in into is it its of on or
+she that the their there they this to was were what when where which who why will with you
+""".split())
+
+class LexicalIndex:
+    """BM25 keyword index over chunk text, backed by SQLite FTS5.
+
+    It sits next to the vector collection and is updated by ingestion with
+    the same chunk IDs. FTS5 keeps an inverted index on disk, so it can be
+    shared by every worker, updated in place, and answers ranked
+    ``ORDER BY rank LIMIT k`` queries in milliseconds on millions of rows.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(settings.DATA_DIR, settings.LEXICAL_INDEX_FILE)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS chunk_map (chunk_id TEXT PRIMARY KEY)")
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5("
+                "content, tokenize='unicode61 remove_diacritics 2')"
+            )
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, ids: Sequence[str], documents: Sequence[str]):
+        """Index or re-index chunks by ID"""
+        conn = self._conn()
+        with conn:
+            for chunk_id, document in zip(ids, documents):
+                conn.execute("INSERT OR IGNORE INTO chunk_map (chunk_id) VALUES (?)", (chunk_id,))
+                (rowid,) = conn.execute("SELECT rowid FROM chunk_map WHERE chunk_id = ?", (chunk_id,)).fetchone()
+                conn.execute("DELETE FROM chunks WHERE rowid = ?", (rowid,))
+                conn.execute("INSERT INTO chunks (rowid, content) VALUES (?, ?)", (rowid, document))
+
+    def delete(self, ids: Sequence[str]):
+        conn = self._conn()
+        with conn:
+            for chunk_id in ids:
+                row = conn.execute("SELECT rowid FROM chunk_map WHERE chunk_id = ?", (chunk_id,)).fetchone()
+                if row:
+                    conn.execute("DELETE FROM chunks WHERE rowid = ?", row)
+                    conn.execute("DELETE FROM chunk_map WHERE rowid = ?", row)
+
+    def reset(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM chunks")
+            conn.execute("DELETE FROM chunk_map")
+
+    @staticmethod
+    def _match_expression(query: str) -> Optional[str]:
+        terms = [t for t in re.findall(r"\w+", query.lower()) if t not in STOPWORDS]
+        if not terms:
+            return None
+        return " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+    def search(self, query: str, k: int = 20) -> List[Tuple[str, float]]:
+        """Return up to ``k`` (chunk_id, bm25 score) pairs, best first.
+
+        SQLite's bm25() is lower-is-better; scores are negated so larger
+        means more relevant.
+        """
+        expression = self._match_expression(query)
+        if not expression:
+            return []
+        try:
+            rows = self._conn().execute(
+                "SELECT m.chunk_id, chunks.rank FROM chunks "
+                "JOIN chunk_map m ON m.rowid = chunks.rowid "
+                "WHERE chunks MATCH ? ORDER BY chunks.rank LIMIT ?",
+                (expression, k)
+            ).fetchall()
+            return [(chunk_id, -rank) for chunk_id, rank in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Lexical search failed for query '{query[:50]}': {e}")
+            return []
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT count(*) FROM chunk_map").fetchone()[0]
+
+lexical_index = LexicalIndex()
@@ -0,0 +1,468 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from backend.app.config import settings
+from backend.app.database.vector_store import WHERE_OPERATORS, VectorStore, where_clauses
+from backend.app.utils.logger import logger
+
+SQLITE_MAX_VARS = 500
+SCAN_BLOCK_BYTES = 1 << 20  # float32 scratch per dequantized block, small enough to stay in cache
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+def quantize_int8(vectors: np.ndarray, scale: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Symmetric per-dimension int8 codes; returns (codes, clipped value count)"""
+    scaled = np.rint(vectors / scale * 127.0)
+    clipped = int(np.count_nonzero(np.abs(scaled) > 127))
+    return np.clip(scaled, -127, 127).astype(np.int8), clipped
+
+def int8_scale(vectors: np.ndarray, headroom: float = 1.25) -> np.ndarray:
+    return np.maximum(np.abs(vectors).max(axis=0) * headroom, 1e-6).astype(np.float32)
+
+def _batched(items: Sequence[Any], size: int = SQLITE_MAX_VARS):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class NumpyVectorStore(VectorStore):
+    """Memory-mapped float32 vector store with brute-force or IVF search.
+
+    Unit-normalized vectors live in a flat ``vectors.f32`` file that every
+    process maps read-only, so uvicorn workers share one copy in the page
+    cache and startup is a single mmap. IDs, documents and metadata live
+    in SQLite next to it and are only read for the returned rows. Deleted
+    rows become tombstones whose slots are reused by later inserts; the
+    file grows in place, so existing mappings stay valid. Readers notice
+    another process's writes through SQLite's ``data_version`` and remap.
+
+    With ``quantization="int8"`` a per-dimension scalar-quantized copy
+    (``vectors.i8``, a quarter of the size) is what gets scanned, and only
+    the best ``NUMPY_RESCORE_CANDIDATES`` rows are re-scored against the
+    float32 file. The full-precision matrix then stays cold on disk apart
+    from those few rows.
+
+    ``where`` filters are evaluated over metadata columns that are pulled
+    out of SQLite once per store version and kept as numpy arrays. The
+    resulting row mask narrows the candidates before any vector is scored.
+
+    Distances are squared L2 between unit vectors (``2 - 2 * cosine``),
+    which matches ChromaDB's default space for normalized embeddings.
+    """
+
+    name = "numpy"
+
+    def __init__(self, path: str, quantization: Optional[str] = None):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.quantization = (quantization or settings.NUMPY_QUANTIZATION).lower()
+        if self.quantization not in ("none", "int8"):
+            raise ValueError(f"Unknown quantization '{self.quantization}', expected 'none' or 'int8'")
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self.codes_path = os.path.join(path, "vectors.i8")
+        self.scale_path = os.path.join(path, "int8_scale.npy")
+        self.centroids_path = os.path.join(path, "ivf_centroids.npy")
+        self._lock = threading.RLock()
+        self.db = sqlite3.connect(os.path.join(path, "store.sqlite3"), timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS rows ("
+            "row INTEGER PRIMARY KEY, chunk_id TEXT UNIQUE, document TEXT, metadata TEXT, "
+            "deleted INTEGER NOT NULL DEFAULT 0, list_id INTEGER NOT NULL DEFAULT -1)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS rows_deleted ON rows (deleted)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.commit()
+
+        self.dim: Optional[int] = None
+        self.matrix: Optional[np.ndarray] = None
+        self.codes: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        self.alive = np.zeros(0, dtype=bool)
+        self.list_ids = np.zeros(0, dtype=np.int32)
+        self.centroids: Optional[np.ndarray] = None
+        self.n_rows = 0
+        self._columns: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._data_version = None
+        self._refresh(force=True)
+
+    # -- loading -----------------------------------------------------------
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _refresh(self, force: bool = False):
+        """Remap the matrix and reload row state if the store changed"""
+        with self._lock:
+            version = self.db.execute("PRAGMA data_version").fetchone()[0]
+            if not force and version == self._data_version:
+                return
+            self._data_version = version
+            self._columns = {}
+
+            dim = self._meta("dim")
+            self.dim = int(dim) if dim else None
+            rows = self.db.execute("SELECT row, deleted, list_id FROM rows").fetchall()
+            self.n_rows = max((r[0] for r in rows), default=-1) + 1
+            self.alive = np.zeros(self.n_rows, dtype=bool)
+            self.list_ids = np.full(self.n_rows, -1, dtype=np.int32)
+            if rows:
+                arr = np.asarray(rows, dtype=np.int64)
+                self.alive[arr[:, 0]] = arr[:, 1] == 0
+                self.list_ids[arr[:, 0]] = arr[:, 2]
+
+            self.matrix = self._map(self.vectors_path, np.float32)
+            self.codes = None
+            self.scale = None
+            if self.quantization == "int8" and os.path.exists(self.scale_path):
+                self.codes = self._map(self.codes_path, np.int8)
+                self.scale = np.load(self.scale_path)
+            self.centroids = np.load(self.centroids_path) if os.path.exists(self.centroids_path) else None
+            logger.debug(f"Loaded numpy vector store {self.path}: {int(self.alive.sum())} vectors")
+
+    def _map(self, path: str, dtype, mode: str = "r") -> Optional[np.ndarray]:
+        if not self.dim or not os.path.exists(path):
+            return None
+        capacity = os.path.getsize(path) // (self.dim * np.dtype(dtype).itemsize)
+        if not capacity:
+            return None
+        return np.memmap(path, dtype=dtype, mode=mode, shape=(capacity, self.dim))
+
+    # -- writes ------------------------------------------------------------
+
+    def _ensure_capacity(self, path: str, dtype, rows_needed: int):
+        row_bytes = self.dim * np.dtype(dtype).itemsize
+        current = os.path.getsize(path) // row_bytes if os.path.exists(path) else 0
+        if rows_needed <= current:
+            return
+        capacity = max(rows_needed, current * 2, 1024)
+        with open(path, "ab") as f:
+            f.truncate(capacity * row_bytes)
+
+    def _write_rows(self, path: str, dtype, rows: Sequence[int], values: np.ndarray):
+        self._ensure_capacity(path, dtype, max(rows) + 1)
+        writable = self._map(path, dtype, mode="r+")
+        writable[np.asarray(rows)] = values
+        writable.flush()
+        del writable
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        ids = list(ids)
+        if not ids:
+            return
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            self._refresh()
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dim', ?)", (str(self.dim),))
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store dimension {self.dim}")
+
+            existing: Dict[str, int] = {}
+            for group in _batched(ids):
+                marks = ",".join("?" * len(group))
+                existing.update(self.db.execute(f"SELECT chunk_id, row FROM rows WHERE chunk_id IN ({marks})", group))
+            free = [r for (r,) in self.db.execute("SELECT row FROM rows WHERE deleted = 1 ORDER BY row DESC")]
+
+            rows, next_row = [], self.n_rows
+            for chunk_id in ids:
+                if chunk_id in existing:
+                    rows.append(existing[chunk_id])
+                elif free:
+                    rows.append(free.pop())
+                else:
+                    rows.append(next_row)
+                    next_row += 1
+
+            self._write_rows(self.vectors_path, np.float32, rows, vectors)
+            # A float-only store switched to int8 is quantized in one pass below
+            backfill = self.quantization == "int8" and self.codes is None and self.n_rows > 0
+            if self.quantization == "int8" and not backfill:
+                self._write_codes(rows, vectors)
+
+            list_ids = self._assign_lists(vectors)
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO rows (row, chunk_id, document, metadata, deleted, list_id) "
+                    "VALUES (?, ?, ?, ?, 0, ?)",
+                    [(row, chunk_id, document, json.dumps(metadata or {}), int(list_id))
+                     for row, chunk_id, document, metadata, list_id in zip(rows, ids, documents, metadatas, list_ids)]
+                )
+            self._refresh(force=True)
+            if backfill:
+                self.requantize()
+
+    def _write_codes(self, rows: Sequence[int], vectors: np.ndarray):
+        """Quantize new vectors, flagging the store for requantization if the
+        current scale had to clip them"""
+        if self.scale is None:
+            self.scale = int8_scale(vectors)
+            tmp_path = f"{self.scale_path}.tmp.npy"
+            np.save(tmp_path, self.scale)
+            os.replace(tmp_path, self.scale_path)
+        codes, clipped = quantize_int8(vectors, self.scale)
+        self._write_rows(self.codes_path, np.int8, rows, codes)
+        if clipped:
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('int8_stale', '1')")
+
+    def requantize(self, block: int = 65536):
+        """Recompute the int8 scale from every live vector and rewrite the codes.
+
+        New codes are written to a side file and swapped in with the scale,
+        so readers see either the old pair or the new one.
+        """
+        with self._lock:
+            self._refresh()
+            if self.matrix is None or not self.alive.any():
+                return
+            live = np.flatnonzero(self.alive)
+            max_abs = np.zeros(self.dim, dtype=np.float32)
+            for start in range(0, len(live), block):
+                max_abs = np.maximum(max_abs, np.abs(np.asarray(self.matrix[live[start:start + block]])).max(axis=0))
+            scale = np.maximum(max_abs * 1.25, 1e-6).astype(np.float32)
+
+            tmp_codes = f"{self.codes_path}.tmp"
+            capacity = self.matrix.shape[0]
+            codes = np.memmap(tmp_codes, dtype=np.int8, mode="w+", shape=(capacity, self.dim))
+            for start in range(0, self.n_rows, block):
+                codes[start:start + block] = quantize_int8(np.asarray(self.matrix[start:start + block]), scale)[0]
+            codes.flush()
+            del codes
+
+            tmp_scale = f"{self.scale_path}.tmp.npy"
+            np.save(tmp_scale, scale)
+            with self.db:
+                os.replace(tmp_codes, self.codes_path)
+                os.replace(tmp_scale, self.scale_path)
+                self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('int8_stale', '0')")
+            self._refresh(force=True)
+            logger.info(f"Requantized {len(live)} vectors to int8")
+
+    def delete(self, ids):
+        ids = list(ids)
+        with self._lock, self.db:
+            for group in _batched(ids):
+                marks = ",".join("?" * len(group))
+                self.db.execute(
+                    f"UPDATE rows SET deleted = 1, chunk_id = NULL, document = NULL, metadata = NULL, list_id = -1 "
+                    f"WHERE chunk_id IN ({marks})", group
+                )
+        self._refresh(force=True)
+
+    def count(self) -> int:
+        self._refresh()
+        return int(self.alive.sum())
+
+    # -- IVF ---------------------------------------------------------------
+
+    def _assign_lists(self, vectors: np.ndarray) -> np.ndarray:
+        if self.centroids is None:
+            return np.full(len(vectors), -1, dtype=np.int32)
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def optimize(self):
+        """Refresh a clipped int8 scale and build the IVF coarse quantizer
+        once the store is large enough"""
+        if self.quantization == "int8" and (self.codes is None or self._meta("int8_stale") == "1"):
+            self.requantize()
+        n_lists = settings.NUMPY_IVF_LISTS
+        if n_lists > 0 and self.count() >= n_lists * 39:
+            self.build_ivf(n_lists)
+
+    def build_ivf(self, n_lists: int, iterations: int = 10, sample_size: int = 100000, block: int = 65536):
+        """Cluster live vectors with spherical k-means and assign every row"""
+        with self._lock:
+            self._refresh()
+            live = np.flatnonzero(self.alive)
+            if len(live) < n_lists:
+                logger.warning(f"Not enough vectors ({len(live)}) for {n_lists} IVF lists")
+                return
+            rng = np.random.default_rng(0)
+            sample = np.asarray(self.matrix[np.sort(rng.choice(live, min(sample_size, len(live)), replace=False))])
+            centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                empty = ~np.bincount(assignment, minlength=n_lists).astype(bool)
+                sums[empty] = centroids[empty]
+                centroids = _normalize(sums)
+
+            list_ids = np.empty(len(live), dtype=np.int32)
+            for start in range(0, len(live), block):
+                rows = live[start:start + block]
+                list_ids[start:start + block] = np.argmax(np.asarray(self.matrix[rows]) @ centroids.T, axis=1)
+
+            tmp_path = f"{self.centroids_path}.tmp.npy"
+            np.save(tmp_path, centroids.astype(np.float32))
+            with self.db:
+                self.db.executemany("UPDATE rows SET list_id = ? WHERE row = ?",
+                                    zip(list_ids.tolist(), live.tolist()))
+                os.replace(tmp_path, self.centroids_path)
+            self._refresh(force=True)
+            logger.info(f"Built IVF index with {n_lists} lists over {len(live)} vectors")
+
+    # -- filters -----------------------------------------------------------
+
+    def _column(self, field: str, numeric: bool) -> np.ndarray:
+        """One metadata field for every row: float64 with NaN for missing
+        values when ``numeric``, otherwise an object array with None"""
+        key = (field, numeric)
+        if key not in self._columns:
+            column = np.full(self.n_rows, np.nan) if numeric else np.full(self.n_rows, None, dtype=object)
+            for row, value in self.db.execute(
+                "SELECT row, json_extract(metadata, ?) FROM rows WHERE deleted = 0", (f"$.{field}",)
+            ):
+                if row >= self.n_rows or value is None:
+                    continue
+                if numeric:
+                    if isinstance(value, (int, float)):
+                        column[row] = value
+                else:
+                    column[row] = value
+            self._columns[key] = column
+        return self._columns[key]
+
+    def _where_mask(self, where: Dict[str, Any]) -> np.ndarray:
+        """Rows matching a ChromaDB-style where filter"""
+        if "$and" in where:
+            mask = np.ones(self.n_rows, dtype=bool)
+            for clause in where["$and"]:
+                mask &= self._where_mask(clause)
+            return mask
+        if "$or" in where:
+            mask = np.zeros(self.n_rows, dtype=bool)
+            for clause in where["$or"]:
+                mask |= self._where_mask(clause)
+            return mask
+        mask = np.ones(self.n_rows, dtype=bool)
+        for field, op, value in where_clauses(where):
+            if op in ("$in", "$nin"):
+                matched = np.isin(self._column(field, False), list(value))
+                mask &= matched if op == "$in" else ~matched
+            elif op not in WHERE_OPERATORS:
+                raise ValueError(f"Unsupported where operator '{op}'")
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                with np.errstate(invalid="ignore"):
+                    mask &= np.asarray(WHERE_OPERATORS[op](self._column(field, True), value), dtype=bool)
+            else:
+                mask &= np.asarray(WHERE_OPERATORS[op](self._column(field, False), value), dtype=bool)
+        return mask
+
+    # -- reads -------------------------------------------------------------
+
+    def _scores(self, rows: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+        """Cosine scores for ``rows`` (all rows if None), from int8 codes when
+        quantized.
+
+        Codes are widened into one reused float32 buffer of SCAN_BLOCK_BYTES
+        and scored with BLAS. Blocks that fit in cache keep the scan about as
+        fast as the float32 one while it reads a quarter of the bytes; larger
+        blocks made it over twice as slow.
+        """
+        if self.codes is None:
+            vectors = self.matrix[:self.n_rows] if rows is None else self.matrix[rows]
+            return np.asarray(vectors) @ query
+        weights = query * self.scale / 127.0
+        total = self.n_rows if rows is None else len(rows)
+        block = max(64, SCAN_BLOCK_BYTES // (4 * self.dim))
+        buffer = np.empty((min(block, total), self.dim), dtype=np.float32)
+        scores = np.empty(total, dtype=np.float32)
+        for start in range(0, total, block):
+            end = min(start + block, total)
+            widened = buffer[:end - start]
+            widened[:] = self.codes[start:end] if rows is None else self.codes[rows[start:end]]
+            scores[start:end] = widened @ weights
+        return scores
+
+    def _search(self, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (rows, cosine scores) of the top ``k`` live vectors, only
+        among rows set in ``mask`` when given"""
+        if self.matrix is None or self.n_rows == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        live = self.alive if mask is None else self.alive & mask
+        if self.centroids is not None and settings.NUMPY_IVF_NPROBE > 0:
+            nprobe = min(settings.NUMPY_IVF_NPROBE, len(self.centroids))
+            probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            candidates = np.flatnonzero(np.isin(self.list_ids, probes) & live)
+            # Rows written before the quantizer existed have no list yet
+            candidates = np.union1d(candidates, np.flatnonzero((self.list_ids < 0) & live))
+            scores = self._scores(candidates, query)
+        elif mask is not None:
+            candidates = np.flatnonzero(live)
+            scores = self._scores(candidates, query)
+        else:
+            candidates = None
+            scores = self._scores(None, query)
+            scores[~self.alive] = -np.inf
+
+        # Quantized scores only shortlist; the shortlist is re-scored exactly
+        shortlist = max(k, settings.NUMPY_RESCORE_CANDIDATES) if self.codes is not None else k
+        shortlist = min(shortlist, int(np.isfinite(scores).sum()))
+        if shortlist <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        top = np.argpartition(-scores, shortlist - 1)[:shortlist]
+        rows = candidates[top] if candidates is not None else top
+        scores = scores[top]
+        if self.codes is not None:
+            scores = np.asarray(self.matrix[np.sort(rows)]) @ query
+            rows = np.sort(rows)
+
+        order = np.argsort(-scores)[:k]
+        return rows[order], scores[order]
+
+    def _fetch_rows(self, rows: Sequence[int]) -> Dict[int, Tuple[str, str, Dict[str, Any]]]:
+        fetched = {}
+        for group in _batched([int(r) for r in rows]):
+            marks = ",".join("?" * len(group))
+            for row, chunk_id, document, metadata in self.db.execute(
+                f"SELECT row, chunk_id, document, metadata FROM rows WHERE row IN ({marks}) AND deleted = 0", group
+            ):
+                fetched[row] = (chunk_id, document, json.loads(metadata) if metadata else {})
+        return fetched
+
+    def query(self, query_embeddings, n_results=10, where=None, include=None):
+        self._refresh()
+        queries = _normalize(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        include = include or ["documents", "metadatas", "distances"]
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": [], "embeddings": []}
+
+        with self._lock:
+            mask = self._where_mask(where) if where else None
+            for query in queries:
+                rows, scores = self._search(query, n_results, mask)
+                fetched = self._fetch_rows(rows)
+                kept = [(row, score) for row, score in zip(rows.tolist(), scores.tolist()) if row in fetched]
+                result["ids"].append([fetched[row][0] for row, _ in kept])
+                result["documents"].append([fetched[row][1] for row, _ in kept])
+                result["metadatas"].append([fetched[row][2] for row, _ in kept])
+                result["distances"].append([2.0 - 2.0 * score for _, score in kept])
+                result["embeddings"].append([np.asarray(self.matrix[row]) for row, _ in kept])
+
+        return {key: value for key, value in result.items() if key == "ids" or key in include}
+
+    def get(self, ids, include=None):
+        ids = list(ids)
+        self._refresh()
+        include = include or ["documents", "metadatas"]
+        result = {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+        with self._lock:
+            for group in _batched(ids):
+                marks = ",".join("?" * len(group))
+                for row, chunk_id, document, metadata in self.db.execute(
+                    f"SELECT row, chunk_id, document, metadata FROM rows WHERE chunk_id IN ({marks})", group
+                ):
+                    result["ids"].append(chunk_id)
+                    result["documents"].append(document)
+                    result["metadatas"].append(json.loads(metadata) if metadata else {})
+                    result["embeddings"].append(np.asarray(self.matrix[row]))
+        return {key: value for key, value in result.items() if key == "ids" or key in include}
@@ -0,0 +1,234 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from backend.app.config import settings
+from backend.app.database.vector_store import (
+    VectorStore, drop_vector_store, get_partition_store, where_clauses
+)
+from backend.app.utils.logger import logger
+
+SQLITE_MAX_VARS = 500
+QUERY_FIELDS = ("ids", "documents", "metadatas", "distances", "embeddings")
+
+def partition_key(timestamp: float, granularity: str) -> str:
+    """UTC day (``20251014``) or ISO week (``2025w42``) holding a timestamp"""
+    moment = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    if granularity == "day":
+        return moment.strftime("%Y%m%d")
+    year, week, _ = moment.isocalendar()
+    return f"{year}w{week:02d}"
+
+def partition_bounds(key: str) -> Tuple[float, float]:
+    """Epoch seconds ``[start, end)`` covered by a partition key"""
+    if "w" in key:
+        year, week = key.split("w")
+        start = datetime.fromisocalendar(int(year), int(week), 1).replace(tzinfo=timezone.utc)
+        return start.timestamp(), (start + timedelta(days=7)).timestamp()
+    start = datetime.strptime(key, "%Y%m%d").replace(tzinfo=timezone.utc)
+    return start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+def time_bounds(where: Optional[Dict[str, Any]]) -> Tuple[float, float]:
+    """The ``published_ts`` range a where filter is confined to"""
+    low, high = -math.inf, math.inf
+    if not where:
+        return low, high
+    for clause in where.get("$and", [where]):
+        for field, op, value in where_clauses(clause):
+            if field != "published_ts" or not isinstance(value, (int, float)):
+                continue
+            if op in ("$gt", "$gte", "$eq"):
+                low = max(low, value)
+            if op in ("$lt", "$lte", "$eq"):
+                high = min(high, value)
+    return low, high
+
+def _batched(items: Sequence[Any], size: int = SQLITE_MAX_VARS):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class PartitionedVectorStore(VectorStore):
+    """A collection split into one physical collection per day or ISO week.
+
+    Chunks land in the partition of their ``published_ts`` metadata, or of
+    the write time when undated. A small SQLite directory maps chunk IDs
+    to partitions, so deletes, gets and re-dated chunks touch only the
+    partitions involved. Queries fan out in parallel to the partitions a
+    ``published_ts`` filter overlaps and merge the per-partition top
+    ``n_results`` by distance. A query with no lower bound searches only
+    the VECTOR_PARTITION_QUERY_DAYS before its upper bound (or now), so
+    latency does not grow with the archive; older periods are reached by
+    filtering on them. Retention drops whole partitions instead of
+    deleting chunk by chunk.
+    """
+
+    def __init__(self, base_name: str, backend: str, granularity: Optional[str] = None):
+        self.base_name = base_name
+        self.backend = backend
+        self.granularity = (granularity or settings.VECTOR_PARTITION).lower()
+        if self.granularity not in ("day", "week"):
+            raise ValueError(f"Unknown partitioning '{self.granularity}', expected 'day' or 'week'")
+        self.name = f"{backend} ({self.granularity} partitions)"
+        self.executor = ThreadPoolExecutor(max_workers=max(1, settings.VECTOR_PARTITION_WORKERS),
+                                           thread_name_prefix="partition-query")
+        self.dirty: Set[str] = set()
+        self._lock = threading.RLock()
+        self.db = sqlite3.connect(os.path.join(settings.DATA_DIR, f"{base_name}.partitions.sqlite3"),
+                                  timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS chunks (chunk_id TEXT PRIMARY KEY, partition TEXT NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS chunks_partition ON chunks (partition)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS partitions (key TEXT PRIMARY KEY, start REAL, end REAL)")
+        self.db.commit()
+
+    def _store(self, key: str) -> VectorStore:
+        return get_partition_store(f"{self.base_name}-{key}", self.backend)
+
+    def partitions(self, low: float = -math.inf, high: float = math.inf) -> List[str]:
+        """Partition keys overlapping ``[low, high]``, oldest first"""
+        with self._lock:
+            rows = self.db.execute("SELECT key, start, end FROM partitions ORDER BY start").fetchall()
+        return [key for key, start, end in rows if end > low and start <= high]
+
+    def _locate(self, ids: Sequence[str]) -> Dict[str, str]:
+        located = {}
+        with self._lock:
+            for group in _batched(list(ids)):
+                marks = ",".join("?" * len(group))
+                located.update(self.db.execute(
+                    f"SELECT chunk_id, partition FROM chunks WHERE chunk_id IN ({marks})", group
+                ).fetchall())
+        return located
+
+    def _group(self, ids: Sequence[str]) -> Dict[str, List[str]]:
+        groups: Dict[str, List[str]] = {}
+        for chunk_id, key in self._locate(ids).items():
+            groups.setdefault(key, []).append(chunk_id)
+        return groups
+
+    # -- writes ------------------------------------------------------------
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        now = time.time()
+        groups: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            published_ts = (metadata or {}).get("published_ts") or now
+            groups.setdefault(partition_key(published_ts, self.granularity), []).append(i)
+
+        with self._lock:
+            previous = self._locate(ids)
+            for key, rows in groups.items():
+                self._store(key).upsert(
+                    ids=[ids[i] for i in rows], embeddings=[embeddings[i] for i in rows],
+                    documents=[documents[i] for i in rows], metadatas=[metadatas[i] for i in rows]
+                )
+            # A chunk whose publication date moved to another partition leaves its old copy behind
+            moved: Dict[str, List[str]] = {}
+            for key, rows in groups.items():
+                for i in rows:
+                    old = previous.get(ids[i])
+                    if old is not None and old != key:
+                        moved.setdefault(old, []).append(ids[i])
+            for key, moved_ids in moved.items():
+                self._store(key).delete(ids=moved_ids)
+
+            with self.db:
+                self.db.executemany("INSERT OR IGNORE INTO partitions (key, start, end) VALUES (?, ?, ?)",
+                                    [(key, *partition_bounds(key)) for key in groups])
+                self.db.executemany("INSERT OR REPLACE INTO chunks (chunk_id, partition) VALUES (?, ?)",
+                                    [(ids[i], key) for key, rows in groups.items() for i in rows])
+            self.dirty.update(groups)
+
+    def delete(self, ids):
+        with self._lock:
+            for key, chunk_ids in self._group(ids).items():
+                self._store(key).delete(ids=chunk_ids)
+                with self.db:
+                    for group in _batched(chunk_ids):
+                        self.db.execute(f"DELETE FROM chunks WHERE chunk_id IN ({','.join('?' * len(group))})", group)
+
+    def drop_partitions(self, before: float) -> List[str]:
+        """Drop every partition that ends at or before ``before`` and return
+        the chunk IDs it held, for cleaning up side indexes"""
+        dropped: List[str] = []
+        with self._lock:
+            expired = [key for key in self.partitions() if partition_bounds(key)[1] <= before]
+            for key in expired:
+                chunk_ids = [row[0] for row in self.db.execute(
+                    "SELECT chunk_id FROM chunks WHERE partition = ?", (key,)
+                )]
+                drop_vector_store(f"{self.base_name}-{key}", self.backend)
+                with self.db:
+                    self.db.execute("DELETE FROM chunks WHERE partition = ?", (key,))
+                    self.db.execute("DELETE FROM partitions WHERE key = ?", (key,))
+                self.dirty.discard(key)
+                dropped.extend(chunk_ids)
+                logger.info(f"Dropped partition {key} with {len(chunk_ids)} chunks")
+        return dropped
+
+    def reset(self):
+        """Drop every partition"""
+        self.drop_partitions(math.inf)
+
+    def optimize(self):
+        """Optimize the partitions written since the last call"""
+        with self._lock:
+            dirty, self.dirty = self.dirty, set()
+        for key in sorted(dirty):
+            self._store(key).optimize()
+
+    # -- reads -------------------------------------------------------------
+
+    def count(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def get(self, ids, include=None):
+        include = include or ["documents", "metadatas"]
+        result: Dict[str, List[Any]] = {"ids": [], **{field: [] for field in include}}
+        for key, chunk_ids in self._group(ids).items():
+            fetched = self._store(key).get(ids=chunk_ids, include=include)
+            for field in result:
+                result[field].extend(fetched.get(field) or [])
+        return result
+
+    def _query_partition(self, key: str, query_embeddings, n_results: int, where, include):
+        try:
+            return self._store(key).query(query_embeddings=query_embeddings, n_results=n_results,
+                                          where=where, include=include)
+        except Exception as e:
+            logger.error(f"Query on partition {key} failed, skipping it: {e}")
+            return None
+
+    def query(self, query_embeddings, n_results=10, where=None, include=None):
+        include = list(include or ["documents", "metadatas", "distances"])
+        fields = ["ids"] + [field for field in QUERY_FIELDS[1:] if field in include]
+        merged: Dict[str, List[List[Any]]] = {field: [[] for _ in query_embeddings] for field in fields}
+        low, high = time_bounds(where)
+        if low == -math.inf and settings.VECTOR_PARTITION_QUERY_DAYS > 0:
+            low = min(high, time.time()) - settings.VECTOR_PARTITION_QUERY_DAYS * 86400
+        keys = self.partitions(low, high)
+        if not keys:
+            return merged
+
+        search_include = include if "distances" in include else include + ["distances"]
+        futures = [
+            self.executor.submit(self._query_partition, key, query_embeddings, n_results, where, search_include)
+            for key in keys
+        ]
+        results = [result for result in (future.result() for future in futures) if result]
+        for q in range(len(query_embeddings)):
+            hits = [
+                (distance, r, j)
+                for r, result in enumerate(results)
+                for j, distance in enumerate(result["distances"][q])
+            ]
+            for _, r, j in sorted(hits)[:n_results]:
+                for field in fields:
+                    merged[field][q].append(results[r][field][q][j])
+        return merged
@@ -1,69 +1,190 @@
 import json
-import redis
+import re
+import time
 import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
 from backend.app.config import settings
 from backend.app.utils.logger import logger
 
+# Append messages, refresh TTLs and cut the list back to its max length in
+# one server-side step, returning the evicted oldest messages.
+APPEND_AND_TRIM_SCRIPT = """
+local length = redis.call('RPUSH', KEYS[1], unpack(ARGV, 3))
+for i = 1, #KEYS do
+    redis.call('EXPIRE', KEYS[i], ARGV[1])
+end
+local overflow = length - tonumber(ARGV[2])
+if overflow <= 0 then
+    return {}
+end
+local evicted = redis.call('LRANGE', KEYS[1], 0, overflow - 1)
+redis.call('LTRIM', KEYS[1], overflow, -1)
+return evicted
+"""
+
 class RedisClient:
+    """Asyncio Redis access for chat sessions over a shared connection pool.
+
+    A session is an append-only list of encoded messages under
+    ``session:{id}``, capped at SESSION_MAX_MESSAGES. Messages trimmed from
+    the front are condensed into a bounded rolling summary list under
+    ``session:{id}:summary``. A small metadata hash lives under
+    ``session:{id}:meta``. All keys carry the session TTL, and per-turn
+    I/O does not depend on how long the conversation has been.
+    """
+
     def __init__(self):
         try:
-            self.client = redis.Redis.from_url(settings.REDIS_URL)
-            self.client.ping()  # Test connection
+            self.pool = redis.ConnectionPool.from_url(
+                settings.REDIS_URL,
+                db=settings.REDIS_DB,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+                health_check_interval=30,
+                decode_responses=False
+            )
+            self.client = redis.Redis(connection_pool=self.pool)
             self.ttl = settings.SESSION_TTL
-            logger.info("Redis client initialized successfully")
-        except redis.ConnectionError as e:
-            logger.error(f"Redis connection error: {e}")
+            self.max_messages = settings.SESSION_MAX_MESSAGES
+            self.msgpack = None
+            if settings.SESSION_ENCODING == "msgpack":
+                try:
+                    import msgpack
+                    self.msgpack = msgpack
+                except ImportError:
+                    logger.warning("msgpack not installed, storing session messages as JSON")
+            self._append_and_trim = self.client.register_script(APPEND_AND_TRIM_SCRIPT)
+            logger.info(f"Redis connection pool initialized (max {settings.REDIS_MAX_CONNECTIONS} connections)")
+        except Exception as e:
+            logger.error(f"Redis initialization error: {e}")
             raise
 
-    def create_session(self) -> str:
+    @staticmethod
+    def _messages_key(session_id: str) -> str:
+        return f"session:{session_id}"
+
+    @staticmethod
+    def _meta_key(session_id: str) -> str:
+        return f"session:{session_id}:meta"
+
+    @staticmethod
+    def _summary_key(session_id: str) -> str:
+        return f"session:{session_id}:summary"
+
+    def _session_keys(self, session_id: str) -> List[str]:
+        return [self._messages_key(session_id), self._meta_key(session_id), self._summary_key(session_id)]
+
+    def _encode(self, role: str, content: str) -> bytes:
+        message = {"role": role, "content": content, "ts": int(time.time())}
+        if self.msgpack is not None:
+            return self.msgpack.packb(message, use_bin_type=True)
+        return json.dumps(message, separators=(",", ":")).encode("utf-8")
+
+    def _decode(self, data: bytes) -> Dict[str, Any]:
+        """Decode a stored message, whichever encoding it was written with"""
+        if data[:1] == b"{":
+            return json.loads(data)
+        if data.startswith((b"user:", b"assistant:")):
+            role, _, content = data.decode("utf-8").partition(":")
+            return {"role": role, "content": content}
+        if self.msgpack is None:
+            import msgpack
+            self.msgpack = msgpack
+        return self.msgpack.unpackb(data, raw=False)
+
+    @staticmethod
+    def _summary_line(message: Dict[str, Any]) -> str:
+        """Condense an evicted message to its first sentence, capped in length"""
+        content = re.sub(r"\s+", " ", message.get("content", "")).strip()
+        first_sentence = re.split(r"(?<=[.!?])\s", content, maxsplit=1)[0]
+        limit = settings.SESSION_SUMMARY_LINE_CHARS
+        if len(first_sentence) > limit:
+            first_sentence = first_sentence[:limit - 3].rstrip() + "..."
+        return f"{message.get('role', 'user')}: {first_sentence}"
+
+    async def ping(self) -> bool:
+        return bool(await self.client.ping())
+
+    async def create_session(self) -> str:
         """Create a new session with empty messages"""
         session_id = str(uuid.uuid4())
-        initial_data = {"messages": []}
-        self.client.setex(
-            f"session:{session_id}",
-            self.ttl,
-            json.dumps(initial_data)
-        )
+        meta_key = self._meta_key(session_id)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hset(meta_key, mapping={"created_at": str(int(time.time()))})
+            pipe.expire(meta_key, self.ttl)
+            await pipe.execute()
         return session_id
 
-    def get_session(self, session_id: str) -> dict:
-        """Retrieve session data"""
-        data = self.client.get(f"session:{session_id}")
-        return json.loads(data) if data else None
-
-    def update_session(self, session_id: str, messages: list) -> bool:
-        """Update session messages"""
-        current_data = self.get_session(session_id)
-        if not current_data:
-            return False
-            
-        current_data["messages"] = messages
-        return bool(
-            self.client.setex(
-                f"session:{session_id}",
-                self.ttl,
-                json.dumps(current_data)
-            )
+    async def get_history(self, session_id: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Read a session's summary and recent messages and refresh its TTL
+        in one round trip"""
+        keys = self._session_keys(session_id)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.lrange(self._summary_key(session_id), 0, -1)
+            pipe.lrange(self._messages_key(session_id), 0, -1)
+            for key in keys:
+                pipe.expire(key, self.ttl)
+            summary, messages = (await pipe.execute())[:2]
+        return [line.decode("utf-8") for line in summary], [self._decode(m) for m in messages]
+
+    async def get_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        """Read a session's recent messages"""
+        _, messages = await self.get_history(session_id)
+        return messages
+
+    async def append_turn(self, session_id: str, user_message: str, assistant_message: str) -> bool:
+        """Store one user/assistant exchange and trim the history server-side.
+
+        The push, TTL refresh and trim run as one script call; only when
+        messages were evicted does a second pipelined call fold them into
+        the rolling summary.
+        """
+        keys = self._session_keys(session_id)
+        evicted = await self._append_and_trim(
+            keys=keys,
+            args=[self.ttl, self.max_messages,
+                  self._encode("user", user_message), self._encode("assistant", assistant_message)]
         )
+        if evicted:
+            summary_key = self._summary_key(session_id)
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.rpush(summary_key, *(self._summary_line(self._decode(m)) for m in evicted))
+                pipe.ltrim(summary_key, -settings.SESSION_SUMMARY_MAX_LINES, -1)
+                pipe.expire(summary_key, self.ttl)
+                await pipe.execute()
+        return True
 
-    def delete_session(self, session_id: str) -> bool:
+    async def delete_session(self, session_id: str) -> bool:
         """Delete a session"""
-        return bool(self.client.delete(f"session:{session_id}"))
+        return bool(await self.client.delete(*self._session_keys(session_id)))
 
-    def get(self, key: str) -> bytes:
+    async def get_recent_articles(self, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of the newest ingested articles; see news_feed.recent_articles"""
+        from backend.app.services.news_feed import recent_articles_async
+        return await recent_articles_async(self.client, limit, cursor)
+
+    async def get(self, key: str) -> Optional[str]:
         """Retrieve a value by key"""
         try:
-            return self.client.get(key)
+            value = await self.client.get(key)
+            return value.decode("utf-8") if value is not None else None
         except redis.RedisError as e:
             logger.error(f"Redis get error for key {key}: {e}")
             raise
 
-    def setex(self, key: str, ttl: int, value: str) -> bool:
+    async def setex(self, key: str, ttl: int, value: str) -> bool:
         """Set a value with an expiration time"""
         try:
-            return bool(self.client.setex(key, ttl, value))
+            return bool(await self.client.setex(key, ttl, value))
         except redis.RedisError as e:
             logger.error(f"Redis setex error for key {key}: {e}")
             raise
 
-redis_client = RedisClient()
\ No newline at end of file
+    async def close(self):
+        await self.client.aclose()
+        await self.pool.disconnect()
+
+redis_client = RedisClient()
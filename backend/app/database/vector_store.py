@@ -0,0 +1,198 @@
+import operator
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+from backend.app.config import settings
+from backend.app.utils.logger import logger
+
+# Comparison operators of ChromaDB's ``where`` syntax; they also apply elementwise to numpy columns
+WHERE_OPERATORS = {
+    "$eq": operator.eq, "$ne": operator.ne,
+    "$gt": operator.gt, "$gte": operator.ge, "$lt": operator.lt, "$lte": operator.le
+}
+
+def build_where(since: Optional[float] = None, until: Optional[float] = None,
+                sources: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    """Metadata filter for a publication window (epoch seconds) and feed sources"""
+    clauses: List[Dict[str, Any]] = []
+    if since is not None:
+        clauses.append({"published_ts": {"$gte": float(since)}})
+    if until is not None:
+        clauses.append({"published_ts": {"$lte": float(until)}})
+    if sources:
+        clauses.append({"source": {"$in": list(sources)}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def where_clauses(where: Dict[str, Any]):
+    """Yield ``(field, operator, value)`` for each condition of a flat where dict"""
+    for field, condition in where.items():
+        if isinstance(condition, dict):
+            for op, value in condition.items():
+                yield field, op, value
+        else:
+            yield field, "$eq", condition
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a ChromaDB-style where filter against one metadata dict"""
+    if not where:
+        return True
+    if "$and" in where:
+        return all(matches_where(metadata, clause) for clause in where["$and"])
+    if "$or" in where:
+        return any(matches_where(metadata, clause) for clause in where["$or"])
+    for field, op, value in where_clauses(where):
+        actual = metadata.get(field)
+        if op == "$in":
+            matched = actual in value
+        elif op == "$nin":
+            matched = actual not in value
+        elif actual is None:
+            matched = op == "$ne"
+        else:
+            try:
+                matched = WHERE_OPERATORS[op](actual, value)
+            except TypeError:
+                matched = False
+        if not matched:
+            return False
+    return True
+
+class VectorStore:
+    """Collection-style interface shared by every vector backend.
+
+    Method names and result shapes follow ChromaDB's Collection, so code
+    written against ``collection.query``/``get``/``upsert``/``delete`` works
+    with any store. ``query`` returns nested per-query lists under ``ids``,
+    ``documents``, ``metadatas`` and ``distances``; ``get`` returns flat
+    lists. ``where`` takes ChromaDB's metadata filter syntax and is applied
+    before ranking, so a filtered query returns the best matching rows
+    rather than a post-filtered top ``n_results``.
+    """
+
+    name = "base"
+
+    def query(self, query_embeddings: Sequence[Sequence[float]], n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def get(self, ids: Sequence[str], include: Optional[List[str]] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def upsert(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]],
+               documents: Sequence[str], metadatas: Sequence[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def delete(self, ids: Sequence[str]):
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def optimize(self):
+        """Hook for backends that build search structures after bulk writes"""
+
+class ChromaVectorStore(VectorStore):
+    name = "chroma"
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def query(self, query_embeddings, n_results=10, where=None, include=None):
+        kwargs = {"query_embeddings": query_embeddings, "n_results": n_results}
+        if where:
+            kwargs["where"] = where
+        if include:
+            kwargs["include"] = include
+        return self.collection.query(**kwargs)
+
+    def get(self, ids, include=None):
+        return self.collection.get(ids=list(ids), include=include or ["documents", "metadatas"])
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.collection.upsert(ids=list(ids), embeddings=embeddings, documents=list(documents), metadatas=list(metadatas))
+
+    def delete(self, ids):
+        self.collection.delete(ids=list(ids))
+
+    def count(self) -> int:
+        return self.collection.count()
+
+_stores: Dict[str, VectorStore] = {}
+_stores_lock = threading.Lock()
+
+def _numpy_store_path(name: str) -> str:
+    return os.path.join(settings.DATA_DIR, settings.NUMPY_STORE_DIR, name)
+
+def _open_store(name: str, backend: str) -> VectorStore:
+    if backend == "chroma":
+        from backend.app.database.chroma_client import get_chroma_client
+        return ChromaVectorStore(get_chroma_client().get_or_create_collection(name=name))
+    if backend == "numpy":
+        from backend.app.database.numpy_vector_store import NumpyVectorStore
+        return NumpyVectorStore(_numpy_store_path(name))
+    raise ValueError(f"Unknown vector store '{backend}', expected 'chroma' or 'numpy'")
+
+def get_partition_store(name: str, backend: str) -> VectorStore:
+    """Return the process-wide store for one physical collection, opening it once"""
+    key = f"{backend}:{name}"
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = _open_store(name, backend)
+            logger.info(f"Opened {backend} vector store '{name}'")
+        return _stores[key]
+
+def get_vector_store(name: Optional[str] = None, backend: Optional[str] = None) -> VectorStore:
+    """Return the process-wide store for a collection, opening it once.
+
+    With VECTOR_PARTITION set to "day" or "week", the collection is a
+    PartitionedVectorStore over one physical collection per period.
+    """
+    name = name or settings.COLLECTION_NAME
+    backend = (backend or settings.VECTOR_STORE).lower()
+    partition = settings.VECTOR_PARTITION.lower()
+    if partition == "none":
+        return get_partition_store(name, backend)
+    key = f"{backend}:{name}:{partition}"
+    with _stores_lock:
+        if key not in _stores:
+            from backend.app.database.partitioned_store import PartitionedVectorStore
+            _stores[key] = PartitionedVectorStore(name, backend, partition)
+            logger.info(f"Opened {backend} vector store '{name}' partitioned by {partition}")
+        return _stores[key]
+
+def reset_vector_store(name: Optional[str] = None, backend: Optional[str] = None) -> VectorStore:
+    """Drop a collection's data and return a fresh, empty store"""
+    name = name or settings.COLLECTION_NAME
+    backend = (backend or settings.VECTOR_STORE).lower()
+    if settings.VECTOR_PARTITION.lower() != "none":
+        store = get_vector_store(name, backend)
+        store.reset()
+        return store
+    drop_vector_store(name, backend)
+    return get_vector_store(name, backend)
+
+def drop_vector_store(name: str, backend: str):
+    """Delete one physical collection and forget its open store"""
+    with _stores_lock:
+        _stores.pop(f"{backend}:{name}", None)
+    if backend == "chroma":
+        from backend.app.database.chroma_client import get_chroma_client
+        try:
+            get_chroma_client().delete_collection(name=name)
+            logger.info(f"Deleted ChromaDB collection '{name}'")
+        except Exception as e:
+            if "not found" in str(e).lower() or "does not exist" in str(e).lower():
+                logger.info(f"Collection '{name}' not found, nothing to delete")
+            else:
+                logger.warning(f"Error deleting collection: {e}")
+    elif backend == "numpy":
+        path = _numpy_store_path(name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+            logger.info(f"Deleted numpy vector store at {path}")
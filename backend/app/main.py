@@ -1,14 +1,41 @@
+import time
+IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.app.routes import chat, news
+from backend.app.routes import chat, news, session
+from backend.app.database.redis_client import redis_client
 from backend.app.config import settings
+from backend.app.services.embedding_service import embedding_cache_stats, embedding_coalescer_stats
+from backend.app.services.news_search import news_search_service
+from backend.app.services.rerank_service import rerank_service
+from backend.app.services.response_cache import response_cache
+from backend.app.services.warmup import preload_models, startup_stats, warm_up
 from backend.app.utils.logger import logger
 import uvicorn
 
+startup_stats["import_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 3)
+
+# Under gunicorn --preload this runs once in the master, before workers fork
+if settings.PRELOAD_MODELS:
+    preload_models()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.WARMUP_ON_STARTUP:
+        await asyncio.to_thread(warm_up)
+    startup_stats["ready_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 3)
+    logger.info(f"API ready {startup_stats['ready_seconds']}s after import started")
+    yield
+    await redis_client.close()
+
 app = FastAPI(
     title="News Chatbot API",
     description="RAG-powered chatbot for news websites",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration
@@ -23,11 +50,23 @@ app.add_middleware(
 # Include routers
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["chat"])
 app.include_router(news.router, prefix="/api/v1/news", tags=["news"])
+app.include_router(session.router, prefix="/api/v1", tags=["session"])
 
 @app.get("/")
 def health_check():
     logger.info("Health check endpoint hit")
     return {"status": "healthy", "app": settings.APP_NAME}
 
+@app.get("/stats")
+def cache_stats():
+    return {
+        "embedding_cache": embedding_cache_stats(),
+        "embedding_coalescer": embedding_coalescer_stats(),
+        "answer_cache": response_cache.stats(),
+        "search_cache": news_search_service.stats(),
+        "rerank": rerank_service.stats(),
+        "startup": startup_stats
+    }
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
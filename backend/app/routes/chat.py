@@ -1,4 +1,7 @@
+import json
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from backend.app.services.rag_service import RAGService
 from backend.app.database.redis_client import redis_client
 from backend.app.utils.logger import logger
@@ -9,27 +12,72 @@ router = APIRouter()
 class ChatRequest(BaseModel):
     sessionId: str
     message: str
+    since: Optional[float] = None  # Only use articles published at or after this epoch time
+    until: Optional[float] = None  # ... and at or before this one
+    sources: Optional[List[str]] = None  # Only use articles from these feed URLs
+
+    def filters(self):
+        return {"since": self.since, "until": self.until, "sources": self.sources}
 
 @router.post("/")
 async def chat_with_bot(request: ChatRequest):
     try:
         # Get session messages from Redis
-        session_key = f"session:{request.sessionId}"
-        messages = await redis_client.lrange(session_key, 0, -1)
+        messages = await redis_client.get_messages(request.sessionId)
         
         # Process with RAG
         rag_service = RAGService()
         response = await rag_service.generate_response(
             request.message,
             session_id=request.sessionId,
-            chat_history=messages
+            chat_history=messages,
+            filters=request.filters()
         )
         
         # Store both messages in Redis
-        await redis_client.rpush(session_key, f"user:{request.message}")
-        await redis_client.rpush(session_key, f"assistant:{response}")
+        await redis_client.append_turn(request.sessionId, request.message, response)
         
         return {"response": response}
     except Exception as e:
         logger.error(f"Chat error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error processing chat request")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Error processing chat request")
+
+@router.post("/stream")
+async def stream_chat_with_bot(request: ChatRequest):
+    """Stream the answer as server-sent events, one ``token`` event per chunk.
+
+    The complete assistant message is stored in the session once generation
+    finishes, followed by a final ``done`` event. If generation fails part
+    way an ``error`` event is sent instead and the turn is not stored.
+    """
+    try:
+        messages = await redis_client.get_messages(request.sessionId)
+        rag_service = RAGService()
+    except Exception as e:
+        logger.error(f"Chat stream setup error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error processing chat request")
+
+    async def events():
+        parts = []
+        try:
+            async for token in rag_service.stream_response(
+                request.message,
+                session_id=request.sessionId,
+                chat_history=messages,
+                filters=request.filters()
+            ):
+                parts.append(token)
+                yield f"event: token\ndata: {json.dumps({'token': token})}\n\n"
+
+            response = "".join(parts).strip()
+            await redis_client.append_turn(request.sessionId, request.message, response)
+            yield f"event: done\ndata: {json.dumps({'response': response})}\n\n"
+        except Exception as e:
+            logger.error(f"Chat stream error: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Error processing chat request'})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
@@ -0,0 +1,60 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+from backend.app.config import settings
+from backend.app.database.redis_client import redis_client
+from backend.app.services.news_feed import MAX_PAGE_SIZE
+from backend.app.services.news_search import news_search_service
+from backend.app.utils.logger import logger
+
+router = APIRouter()
+
+class SearchRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=1000)
+    limit: int = Field(10, ge=1, le=settings.SEARCH_MAX_PAGE_SIZE)
+    cursor: Optional[str] = None  # next_cursor of the previous page
+    since: Optional[float] = None  # Only articles published at or after this epoch time
+    until: Optional[float] = None  # ... and at or before this one
+    sources: Optional[List[str]] = None  # Only articles from these feed URLs
+
+async def _search(request: SearchRequest):
+    try:
+        return await news_search_service.search(
+            request.query,
+            limit=request.limit,
+            cursor=request.cursor,
+            filters={"since": request.since, "until": request.until, "sources": request.sources}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"News search error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error searching news")
+
+@router.post("/search")
+async def search_news(request: SearchRequest):
+    """Articles matching a query, best first, one page per call.
+
+    Pass ``next_cursor`` back as ``cursor`` with the same query and
+    filters for the next page.
+    """
+    return await _search(request)
+
+@router.get("/search")
+async def search_news_get(q: str = Query(..., min_length=1, max_length=1000),
+                          limit: int = Query(10, ge=1, le=settings.SEARCH_MAX_PAGE_SIZE),
+                          cursor: Optional[str] = None, since: Optional[float] = None,
+                          until: Optional[float] = None, source: Optional[List[str]] = Query(None)):
+    """GET form of POST /search; repeat ``source`` for several feeds"""
+    return await _search(SearchRequest(query=q, limit=limit, cursor=cursor, since=since, until=until, sources=source))
+
+@router.get("/recent")
+async def get_recent_news(limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None):
+    """Newest articles first. Pass ``next_cursor`` back as ``cursor`` for the next page."""
+    try:
+        return await redis_client.get_recent_articles(limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Recent news error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching recent news")
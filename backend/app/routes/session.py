@@ -1,26 +1,31 @@
 from fastapi import APIRouter, HTTPException
 from backend.app.database.redis_client import redis_client
 from backend.app.utils.logger import logger
-import uuid
 
 router = APIRouter()
 
 @router.post("/session")
 async def create_session():
     try:
-        session_id = str(uuid.uuid4())
-        session_key = f"session:{session_id}"
-        await redis_client.set(session_key, "")
+        session_id = await redis_client.create_session()
         return {"sessionId": session_id, "messages": []}
     except Exception as e:
         logger.error(f"Session creation error: {str(e)}")
         raise HTTPException(status_code=500, detail="Error creating session")
 
+@router.get("/session/{session_id}")
+async def get_session_history(session_id: str):
+    try:
+        summary, messages = await redis_client.get_history(session_id)
+        return {"sessionId": session_id, "summary": summary, "messages": messages}
+    except Exception as e:
+        logger.error(f"Session history error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching session history")
+
 @router.delete("/session/{session_id}")
 async def reset_session(session_id: str):
     try:
-        session_key = f"session:{session_id}"
-        await redis_client.delete(session_key)
+        await redis_client.delete_session(session_id)
         return {"status": "success"}
     except Exception as e:
         logger.error(f"Session reset error: {str(e)}")
@@ -1,10 +1,10 @@
 # Services package initialization
 from .news_service import NewsService
-from .embedding_service import get_embeddings
+from .embedding_service import get_embeddings, get_query_embedding
 from .rag_service import RAGService
 from .gemini_service import generate_response
 
 __all__ = [
-    "NewsService", "get_embeddings",
+    "NewsService", "get_embeddings", "get_query_embedding",
     "RAGService", "generate_response"
 ]
\ No newline at end of file
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from backend.app.config import settings
+from backend.app.utils.helpers import hash_text
+from backend.app.utils.logger import logger
+
+BOILERPLATE_TAGS = ("script", "style", "noscript", "nav", "header", "footer", "aside", "form", "figure", "iframe", "svg")
+MIN_PARAGRAPH_CHARS = 40
+
+def _paragraphs_lxml(html: bytes) -> List[str]:
+    import lxml.html
+    from lxml import etree
+
+    root = lxml.html.fromstring(html)
+    etree.strip_elements(root, *BOILERPLATE_TAGS, with_tail=False)
+    articles = root.xpath("//article")
+    # Prefer an <article> element; otherwise the block holding the most paragraph text
+    if articles:
+        container = max(articles, key=lambda el: len(el.text_content()))
+    else:
+        weights: Dict = {}
+        for p in root.iter("p"):
+            parent = p.getparent()
+            if parent is not None:
+                weights[parent] = weights.get(parent, 0) + len(p.text_content())
+        container = max(weights, key=weights.get) if weights else root
+    return [p.text_content() for p in container.iter("p")]
+
+def _paragraphs_bs4(html: bytes) -> List[str]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    container = soup.find("article") or soup
+    return [p.get_text() for p in container.find_all("p")]
+
+def extract_main_text(html: bytes) -> str:
+    """Main body text of an article page, as paragraphs joined by blank lines.
+
+    Runs in parser worker processes, so it only takes and returns plain
+    values. Uses lxml when installed and BeautifulSoup's parser otherwise.
+    """
+    try:
+        paragraphs = _paragraphs_lxml(html)
+    except ImportError:
+        paragraphs = _paragraphs_bs4(html)
+    except Exception:
+        return ""
+    cleaned = (re.sub(r"\s+", " ", p).strip() for p in paragraphs)
+    return "\n\n".join(p for p in cleaned if len(p) >= MIN_PARAGRAPH_CHARS)
+
+class PageCache:
+    """Raw article HTML on disk, keyed by URL, with the response's validators.
+
+    A cached page younger than ARTICLE_CACHE_TTL is reused without a
+    request. An older one is revalidated with its ETag/Last-Modified, and
+    a 304 keeps the cached body.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(settings.DATA_DIR, settings.ARTICLE_CACHE_DIR)
+        os.makedirs(self.path, exist_ok=True)
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hash_text(url)
+        return os.path.join(self.path, f"{key}.json"), os.path.join(self.path, f"{key}.html")
+
+    def get(self, url: str) -> Tuple[Optional[Dict], Optional[bytes]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def set(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]):
+        meta_path, body_path = self._paths(url)
+        meta = {"url": url, "etag": etag or "", "last_modified": last_modified or "", "fetched_at": time.time()}
+        try:
+            # Body first, so a meta file never points at a missing page
+            for path, mode, data in ((body_path, "wb", body), (meta_path, "w", json.dumps(meta))):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, mode) as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to cache page {url}: {e}")
+
+    def touch(self, url: str):
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            meta["fetched_at"] = time.time()
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+        except (OSError, ValueError):
+            pass
+
+class DomainLimiter:
+    """Caps concurrent requests per domain and spaces their start times"""
+
+    def __init__(self, concurrency: int, min_interval: float):
+        self.concurrency = max(1, concurrency)
+        self.min_interval = min_interval
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    def slot(self, domain: str) -> asyncio.Semaphore:
+        if domain not in self._semaphores:
+            self._semaphores[domain] = asyncio.Semaphore(self.concurrency)
+        return self._semaphores[domain]
+
+    async def wait_turn(self, domain: str):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next_start.get(domain, now))
+        self._next_start[domain] = start + self.min_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+class ArticleExtractor:
+    """Fetches the pages behind feed entries and replaces their teaser text
+    with the extracted article body.
+
+    Fetches run concurrently over the caller's aiohttp session, bounded
+    overall and per domain. HTML parsing is handed to a process pool so the
+    event loop keeps fetching while pages are parsed on every core.
+    """
+
+    def __init__(self, workers: Optional[int] = None, cache: Optional[PageCache] = None):
+        workers = settings.ARTICLE_PARSE_WORKERS if workers is None else workers
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.cache = cache or PageCache()
+        self.limiter: Optional[DomainLimiter] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"fetched": 0, "cached": 0, "not_modified": 0, "failed": 0, "extracted": 0}
+        try:
+            import lxml.html  # noqa: F401
+        except ImportError:
+            logger.warning("lxml not installed, extracting article text with BeautifulSoup")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned, not forked: forking a process with torch or aiohttp loaded is unsafe
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+        return self._pool
+
+    def _bind_limits(self):
+        """Create the fetch limits once per event loop, so concurrent
+        extract() calls share them"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(settings.ARTICLE_FETCH_CONCURRENCY)
+            self.limiter = DomainLimiter(settings.ARTICLE_PER_DOMAIN_LIMIT, settings.ARTICLE_DOMAIN_INTERVAL_MS / 1000)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def extract(self, session: aiohttp.ClientSession, articles: List[Dict]) -> List[Dict]:
+        """Fill in ``content`` with full article text where it beats the feed's"""
+        self._bind_limits()
+        extracted = 0
+
+        async def run(article: Dict):
+            nonlocal extracted
+            async with self._semaphore:
+                html = await self._fetch_page(session, article["url"])
+            if not html:
+                return
+            try:
+                text = await asyncio.get_running_loop().run_in_executor(self._get_pool(), extract_main_text, html)
+            except Exception as e:
+                logger.error(f"Failed to parse article page {article['url']}: {e}")
+                self.stats["failed"] += 1
+                return
+            if len(text) > len(article.get("content") or ""):
+                article["content"] = text
+                self.stats["extracted"] += 1
+                extracted += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run(article) for article in articles))
+        logger.info(f"Extracted {extracted}/{len(articles)} full articles in "
+                    f"{time.perf_counter() - start:.1f}s (totals: {self.stats})")
+        return articles
+
+    async def _fetch_page(self, session: aiohttp.ClientSession, url: str) -> Optional[bytes]:
+        # Page cache reads and writes are disk I/O, kept off the event loop
+        meta, cached = await asyncio.to_thread(self.cache.get, url)
+        if cached is not None and time.time() - meta.get("fetched_at", 0) < settings.ARTICLE_CACHE_TTL:
+            self.stats["cached"] += 1
+            return cached
+
+        headers = {}
+        if cached is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        domain = urlparse(url).netloc.lower()
+        try:
+            async with self.limiter.slot(domain):
+                await self.limiter.wait_turn(domain)
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304 and cached is not None:
+                        await asyncio.to_thread(self.cache.touch, url)
+                        self.stats["not_modified"] += 1
+                        return cached
+                    if response.status != 200 or "html" not in response.headers.get("Content-Type", "html"):
+                        logger.warning(f"Skipping article page {url}: status {response.status}")
+                        self.stats["failed"] += 1
+                        return cached
+                    body = await response.read()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+        except Exception as e:
+            logger.error(f"Failed to fetch article page {url}: {e}")
+            self.stats["failed"] += 1
+            return cached
+
+        await asyncio.to_thread(self.cache.set, url, body, etag, last_modified)
+        self.stats["fetched"] += 1
+        return body
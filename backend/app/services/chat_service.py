@@ -1,51 +1,36 @@
 # backend/app/services/chat_service.py
 from typing import List, Dict
-from app.database.chroma_client import chroma_client
-from app.services.embedding_service import get_embeddings
+from app.database.vector_store import get_vector_store
+from app.services.embedding_service import get_query_embedding
+from app.services.news_feed import recent_articles
+from app.services.news_search import news_search_service
+from app.services.context_builder import build_context
+from app.services.rag_service import CHUNK_FIELDS, RAGService
 import redis
 import json
 
 class ChatService:
     def __init__(self):
         self.redis_client = redis.Redis(host='localhost', port=6379, db=0)
-        self.collection = chroma_client.get_collection("news_articles")
+        self.collection = get_vector_store()
     
     async def search_news(self, query: str) -> List[Dict]:
-        """Search news articles using vector similarity"""
-        query_embedding = get_embeddings(query)
-        results = self.collection.query(
-            query_embeddings=[query_embedding.tolist()],
-            n_results=10
-        )
-        
-        articles = []
-        for i, doc in enumerate(results['documents'][0]):
-            metadata = results['metadatas'][0][i]
-            articles.append({
-                "title": metadata['title'],
-                "url": metadata['url'],
-                "snippet": doc[:200] + "...",
-                "published_date": metadata.get('published_date', '')
-            })
-        
-        return articles
+        """Search news articles, best match first, one entry per article"""
+        page = await news_search_service.search(query, limit=10)
+        return page["articles"]
     
     async def get_chat_response(self, query: str) -> Dict:
         """Get a chat response using RAG with news context"""
         # First get relevant news context
-        query_embedding = get_embeddings(query)
+        query_embedding = get_query_embedding(query)
         results = self.collection.query(
             query_embeddings=[query_embedding.tolist()],
-            n_results=5
+            n_results=5,
+            include=CHUNK_FIELDS + ["distances"]
         )
         
-        # Build context from top results
-        context = "\n\n".join([
-            f"Article: {results['metadatas'][0][i]['title']}\n"
-            f"Content: {doc}\n"
-            f"Source: {results['metadatas'][0][i]['url']}"
-            for i, doc in enumerate(results['documents'][0])
-        ])
+        # Build context from top results: overlapping chunks merged, repeats dropped, trimmed to budget
+        context = build_context(query, RAGService._to_chunks(results), query_embedding)
         
         # Get response from LLM (Gemini in your case)
         prompt = f"""
@@ -71,17 +56,17 @@ class ChatService:
         }
     
     async def get_recent_news(self) -> List[Dict]:
-        """Get recently ingested news from Redis"""
-        articles = []
-        for key in self.redis_client.keys('article:*'):
-            data = self.redis_client.hgetall(key)
-            articles.append({
-                "title": data[b'title'].decode(),
-                "url": data[b'url'].decode(),
-                "snippet": f"Recent news about {data[b'title'].decode()[:50]}...",
-                "published_date": data[b'published_date'].decode()
-            })
-        return articles[:10]  # Return top 10 recent
+        """Get the 10 most recently published news articles from Redis"""
+        page = recent_articles(self.redis_client, limit=10)
+        return [
+            {
+                "title": article['title'],
+                "url": article['url'],
+                "snippet": article.get('snippet') or f"Recent news about {article['title'][:50]}...",
+                "published_date": article.get('published_date', '')
+            }
+            for article in page["articles"]
+        ]
     
     async def _get_llm_response(self, prompt: str) -> str:
         """Implement your Gemini API call here"""
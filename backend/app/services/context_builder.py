@@ -0,0 +1,105 @@
+import re
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+from backend.app.config import settings
+from backend.app.database.lexical_index import STOPWORDS
+from backend.app.utils.helpers import estimate_tokens, split_sentences
+from backend.app.utils.logger import logger
+
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+LEXICAL_WEIGHT = 0.5  # Weight of query-term overlap next to the parent chunk's similarity
+
+def _terms(text: str) -> Set[str]:
+    return {term for term in re.findall(r"\w+", text.lower()) if term not in STOPWORDS}
+
+def _sentence_key(sentence: str) -> str:
+    return " ".join(re.findall(r"\w+", sentence.lower()))
+
+def _unit(vector) -> Optional[np.ndarray]:
+    if vector is None:
+        return None
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+def _relevance(chunk: Dict[str, Any], query_vector: Optional[np.ndarray], chunk_vector: Optional[np.ndarray]) -> float:
+    if query_vector is not None and chunk_vector is not None:
+        return float(chunk_vector @ query_vector)
+    if chunk.get("distance") is not None:
+        return 1.0 - chunk["distance"] / 2.0  # squared L2 between unit vectors
+    return 0.5
+
+def build_context(query: str, chunks: List[Dict[str, Any]], query_embedding=None,
+                  max_tokens: Optional[int] = None) -> str:
+    """Assemble a prompt context from ranked chunks within a token budget.
+
+    - Chunks whose embedding is a near-copy of an already kept chunk
+      (CONTEXT_DUPLICATE_THRESHOLD) are dropped.
+    - The remaining chunks of each article are merged in chunk order, so
+      the sentences repeated by chunk overlap appear once. Sentences seen
+      in an earlier article (syndicated copy, boilerplate) are dropped too.
+    - Sentences are scored by the similarity of their chunk to the query,
+      using the embeddings retrieval already returned, plus their overlap
+      with the query's terms. The best are taken until ``max_tokens``
+      (CONTEXT_MAX_TOKENS) is filled.
+    - Each article's picks are printed in original order under a
+      title line, articles in retrieval order.
+    """
+    max_tokens = settings.CONTEXT_MAX_TOKENS if max_tokens is None else max_tokens
+    query_vector = _unit(query_embedding)
+    query_terms = _terms(query)
+
+    kept_vectors: List[np.ndarray] = []
+    articles: Dict[str, Dict[str, Any]] = {}
+    for chunk in chunks:
+        document = chunk.get("document")
+        if not document:
+            continue
+        vector = _unit(chunk.get("embedding"))
+        if vector is not None:
+            if any(float(vector @ other) >= settings.CONTEXT_DUPLICATE_THRESHOLD for other in kept_vectors):
+                continue
+            kept_vectors.append(vector)
+        metadata = chunk.get("metadata") or {}
+        url = metadata.get("url") or chunk.get("id", "")
+        article = articles.setdefault(url, {"metadata": metadata, "chunks": []})
+        article["chunks"].append((metadata.get("chunk_index", 0), _relevance(chunk, query_vector, vector), document))
+
+    seen: Set[str] = set()
+    candidates = []  # (score, article order, position, sentence, tokens)
+    for order, article in enumerate(articles.values()):
+        position = 0
+        for _, relevance, document in sorted(article["chunks"], key=lambda item: item[0]):
+            for sentence in split_sentences(document):
+                key = _sentence_key(sentence)
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                terms = _terms(sentence)
+                overlap = len(terms & query_terms) / len(query_terms) if query_terms else 0.0
+                candidates.append((relevance + LEXICAL_WEIGHT * overlap, order, position, sentence, estimate_tokens(sentence)))
+                position += 1
+
+    headers = [
+        f"{a['metadata'].get('title', '')} ({a['metadata'].get('published_date') or 'undated'})"
+        for a in articles.values()
+    ]
+    selected: Dict[int, List[tuple]] = {}
+    used = 0
+    for score, order, position, sentence, tokens in sorted(candidates, key=lambda c: -c[0]):
+        cost = tokens + (estimate_tokens(headers[order]) if order not in selected else 0)
+        # The best sentence always goes in, even over budget, so the context is never empty
+        if used + cost > max_tokens and used:
+            continue
+        selected.setdefault(order, []).append((position, sentence))
+        used += cost
+
+    context = CONTEXT_SEPARATOR.join(
+        f"{headers[order]}\n" + " ".join(sentence for _, sentence in sorted(selected[order]))
+        for order in sorted(selected)
+    )
+    original = sum(estimate_tokens(chunk.get("document") or "") for chunk in chunks)
+    logger.debug(f"Built context of ~{used} tokens from {len(chunks)} chunks (~{original} tokens), "
+                 f"{len(selected)}/{len(articles)} articles")
+    return context
@@ -0,0 +1,117 @@
+import hashlib
+import re
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from backend.app.config import settings
+from backend.app.utils.logger import logger
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands of 8 rows: pairs above ~0.7 Jaccard almost always collide
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+MIN_WORDS = 30  # Teasers shorter than this fingerprint too noisily to collapse
+
+_rng = np.random.default_rng(0x5EED)
+_MASKS = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+_MULTIPLIERS = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of a text's word 3-shingles, or None for very short texts.
+
+    Each permutation is an xor with a random mask followed by
+    multiplication by a random odd constant, which is a bijection on
+    64-bit values; the top 32 bits of each minimum are kept.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    permuted = (hashes[:, None] ^ _MASKS) * _MULTIPLIERS
+    return (permuted.min(axis=0) >> np.uint64(32)).astype(np.uint32)
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    return float(np.mean(a == b))
+
+def band_keys(signature: np.ndarray) -> List[str]:
+    return [
+        f"dedup:band:{i}:{hashlib.blake2b(signature[i * ROWS:(i + 1) * ROWS].tobytes(), digest_size=8).hexdigest()}"
+        for i in range(BANDS)
+    ]
+
+def encode_signature(signature: np.ndarray) -> str:
+    return signature.astype("<u4").tobytes().hex()
+
+def decode_signature(value) -> np.ndarray:
+    if isinstance(value, bytes):
+        value = value.decode()
+    return np.frombuffer(bytes.fromhex(value), dtype="<u4").astype(np.uint32)
+
+class NearDuplicateIndex:
+    """MinHash-LSH index for collapsing near-duplicate articles.
+
+    Each signature is cut into 16 bands of 8 values, and every band hash
+    is a Redis set of the article keys that have it. Finding candidates
+    takes 16 set lookups whatever the corpus size. Only those candidates
+    are compared against the signature stored on their article hash.
+    Articles indexed earlier in the same run are held locally until they
+    commit.
+    """
+
+    def __init__(self, redis_client, threshold: Optional[float] = None):
+        self.redis_client = redis_client
+        self.threshold = settings.DEDUP_THRESHOLD if threshold is None else threshold
+        self.local_bands: Dict[str, Set[str]] = {}
+        self.local_signatures: Dict[str, np.ndarray] = {}
+
+    def find(self, key: str, signature: np.ndarray) -> Optional[str]:
+        """Return the most similar indexed article above the threshold, other than ``key``"""
+        bands = band_keys(signature)
+        pipe = self.redis_client.pipeline(transaction=False)
+        for band in bands:
+            pipe.smembers(band)
+        candidates: Set[str] = set()
+        for band, members in zip(bands, pipe.execute()):
+            candidates.update(m.decode() if isinstance(m, bytes) else m for m in members)
+            candidates.update(self.local_bands.get(band, ()))
+        candidates.discard(key)
+        if not candidates:
+            return None
+
+        signatures = {c: self.local_signatures[c] for c in candidates if c in self.local_signatures}
+        remote = sorted(c for c in candidates if c not in signatures)
+        if remote:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for candidate in remote:
+                pipe.hget(candidate, "minhash")
+            for candidate, value in zip(remote, pipe.execute()):
+                if value:
+                    signatures[candidate] = decode_signature(value)
+
+        score, best = max(((similarity(signature, s), c) for c, s in signatures.items()), default=(0.0, None))
+        if best is not None and score >= self.threshold:
+            logger.debug(f"Article {key} matches {best} at estimated Jaccard {score:.2f}")
+            return best
+        return None
+
+    def add_local(self, key: str, signature: np.ndarray):
+        self.local_signatures[key] = signature
+        for band in band_keys(signature):
+            self.local_bands.setdefault(band, set()).add(key)
+
+    def index(self, pipe, key: str, signature: np.ndarray, previous: Optional[np.ndarray] = None):
+        """Queue band membership writes for a committed article on ``pipe``"""
+        if previous is not None and not np.array_equal(previous, signature):
+            self.unindex(pipe, key, previous)
+        for band in band_keys(signature):
+            pipe.sadd(band, key)
+
+    @staticmethod
+    def unindex(pipe, key: str, signature: np.ndarray):
+        for band in band_keys(signature):
+            pipe.srem(band, key)
@@ -1,15 +1,77 @@
-from sentence_transformers import SentenceTransformer
+import asyncio
+import functools
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from backend.app.config import settings
+from backend.app.utils.cache import LRUCache
+from backend.app.utils.helpers import hash_text
 from backend.app.utils.logger import logger
+from backend.app.utils.metrics import Histogram
 
 class EmbeddingService:
+    """Sentence embeddings from a model that is loaded on first use.
+
+    Importing this module stays cheap: torch and the model weights are only
+    loaded by the first encode, or ahead of traffic by ``warm_up``.
+    """
+
     def __init__(self):
+        self._model = None
+        self._lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def _load(self):
         try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("Loaded embedding model: all-MiniLM-L6-v2")
+            start = time.perf_counter()
+            backend = settings.EMBEDDING_BACKEND.lower()
+            if backend == "onnx":
+                from backend.app.services.onnx_embedding import OnnxEmbeddingModel
+                model = OnnxEmbeddingModel()
+            elif backend == "torch":
+                import torch
+                from sentence_transformers import SentenceTransformer
+                if settings.EMBEDDING_THREADS > 0:
+                    torch.set_num_threads(settings.EMBEDDING_THREADS)
+                model = SentenceTransformer(settings.EMBEDDING_MODEL)
+            else:
+                raise ValueError(f"Unknown embedding backend '{backend}', expected 'torch' or 'onnx'")
+            self.load_seconds = time.perf_counter() - start
+            logger.info(f"Loaded embedding model: {settings.EMBEDDING_MODEL} ({backend}) in {self.load_seconds:.2f}s")
+            # Two positions go to the [CLS]/[SEP] markers
+            if settings.CHUNK_SIZE > model.max_seq_length - 2:
+                logger.warning(f"CHUNK_SIZE {settings.CHUNK_SIZE} exceeds the model's {model.max_seq_length} "
+                               f"token limit; chunk tails will be truncated")
+            return model
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             raise
 
+    def warm_up(self, encode: bool = True):
+        """Load the model and, with ``encode``, run one forward pass so the
+        first real query does not pay for kernel initialization"""
+        model = self.model
+        if encode:
+            model.encode("warm up", convert_to_numpy=True)
+
     def get_embeddings(self, text: str):
         try:
             if not text or not isinstance(text, str):
@@ -24,7 +86,294 @@ class EmbeddingService:
             logger.error(f"Embedding generation failed for text: {text[:50]}...: {e}")
             return None
 
+    def get_embeddings_batch(self, texts: List[str], batch_size: Optional[int] = None) -> Optional[np.ndarray]:
+        """Embed many texts with one batched model.encode call"""
+        try:
+            if not texts:
+                return None
+            embeddings = self.model.encode(
+                texts,
+                batch_size=batch_size or settings.EMBEDDING_BATCH_SIZE,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            if embeddings is None or len(embeddings) != len(texts):
+                logger.error(f"Batch embedding returned {0 if embeddings is None else len(embeddings)} vectors for {len(texts)} texts")
+                return None
+            return embeddings
+        except Exception as e:
+            logger.error(f"Batch embedding failed for {len(texts)} texts: {e}")
+            return None
+
+class QueryEmbeddingCache:
+    """Two-tier cache of normalized query text -> float32 embedding.
+
+    The first tier is a bounded in-process LRU, read by ``get``/``set``.
+    The optional second tier lives in Redis so workers share each other's
+    query embeddings. It goes through the app's shared asyncio client, so
+    only the async ``aget``/``aset`` used on the event loop consult it.
+    Redis errors are logged and treated as misses so the cache never
+    breaks a query.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(maxsize=settings.EMBEDDING_CACHE_SIZE, ttl=settings.EMBEDDING_CACHE_TTL)
+        self.redis_enabled = settings.EMBEDDING_CACHE_REDIS
+        self.redis_hits = 0
+        self.redis_misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return re.sub(r'\s+', ' ', text).strip().lower()
+
+    def _redis_key(self, normalized: str) -> str:
+        return f"embcache:{settings.EMBEDDING_MODEL}:{hash_text(normalized)}"
+
+    @staticmethod
+    def _redis():
+        # Imported lazily so embedding worker processes never open a Redis pool
+        from backend.app.database.redis_client import redis_client
+        return redis_client.client
+
+    def get(self, normalized: str) -> Optional[np.ndarray]:
+        return self.local.get(normalized)
+
+    def set(self, normalized: str, embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        self.local.set(normalized, embedding)
+        return embedding
+
+    async def aget(self, normalized: str) -> Optional[np.ndarray]:
+        embedding = self.local.get(normalized)
+        if embedding is not None or not self.redis_enabled:
+            return embedding
+        try:
+            data = await self._redis().get(self._redis_key(normalized))
+        except Exception as e:
+            logger.warning(f"Redis embedding cache read failed: {e}")
+            data = None
+        if data is None:
+            self.redis_misses += 1
+            return None
+        self.redis_hits += 1
+        embedding = np.frombuffer(data, dtype=np.float32)
+        self.local.set(normalized, embedding)
+        return embedding
+
+    async def aset(self, normalized: str, embedding: np.ndarray):
+        embedding = self.set(normalized, embedding)
+        if self.redis_enabled:
+            try:
+                await self._redis().setex(self._redis_key(normalized), settings.EMBEDDING_CACHE_TTL, embedding.tobytes())
+            except Exception as e:
+                logger.warning(f"Redis embedding cache write failed: {e}")
+
+    def stats(self) -> dict:
+        stats = self.local.stats()
+        stats["redis_enabled"] = self.redis_enabled
+        stats["redis_hits"] = self.redis_hits
+        stats["redis_misses"] = self.redis_misses
+        return stats
+
 embedding_service = EmbeddingService()
+query_embedding_cache = QueryEmbeddingCache()
 
 def get_embeddings(text: str):
-    return embedding_service.get_embeddings(text)
\ No newline at end of file
+    return embedding_service.get_embeddings(text)
+
+def get_query_embedding(text: str) -> Optional[np.ndarray]:
+    """Embed a search query, serving repeated queries from the cache"""
+    if not text or not isinstance(text, str):
+        logger.warning(f"Invalid text for embedding: {text}")
+        return None
+    normalized = query_embedding_cache.normalize(text)
+    embedding = query_embedding_cache.get(normalized)
+    if embedding is not None:
+        return embedding
+    embedding = embedding_service.get_embeddings(normalized)
+    if embedding is not None:
+        query_embedding_cache.set(normalized, embedding)
+    return embedding
+
+def embedding_cache_stats() -> dict:
+    return query_embedding_cache.stats()
+
+class EmbeddingCoalescer:
+    """Micro-batches concurrent query embeddings into one encode call.
+
+    Callers on the event loop enqueue their text and await a future. While
+    the encoder is idle, the queue is flushed as one batch once the oldest
+    text has waited ``max_wait_ms``. While a batch is encoding, the queue
+    keeps filling and is flushed as soon as that batch resolves, so
+    batches grow with load instead of queueing small encodes. A queue that
+    reaches ``max_batch`` texts is always flushed at once. Batches are
+    encoded on a dedicated worker thread, and every future is then
+    resolved with its own row.
+    """
+
+    def __init__(self, max_batch: Optional[int] = None, max_wait_ms: Optional[float] = None):
+        self.max_batch = max_batch or settings.EMBEDDING_COALESCE_MAX_BATCH
+        self.max_wait = (settings.EMBEDDING_COALESCE_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-coalescer")
+        self.pending: List[Tuple[str, asyncio.Future, float]] = []
+        self.inflight = 0  # batches handed to the encoder and not yet resolved
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.wait_ms = Histogram([1, 2, 5, 10, 20, 50, 100, 250])
+        self.encode_ms = Histogram([5, 10, 20, 50, 100, 250, 500, 1000])
+
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A new event loop (e.g. another asyncio.run) cannot reuse old futures or timers
+            self._loop, self.pending, self.inflight, self._timer = loop, [], 0, None
+        future = loop.create_future()
+        self.pending.append((text, future, loop.time()))
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif not self.inflight and self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # A partial batch waits for the running encode; _resolve flushes it
+        while self.pending and (not self.inflight or len(self.pending) >= self.max_batch):
+            batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+            now = self._loop.time()
+            for _, _, enqueued in batch:
+                self.wait_ms.observe((now - enqueued) * 1000)
+            self.batch_sizes.observe(len(batch))
+            self.inflight += 1
+            task = self._loop.run_in_executor(self.executor, self._encode, [text for text, _, _ in batch])
+            task.add_done_callback(functools.partial(self._resolve, batch))
+
+    def _encode(self, texts: List[str]) -> Optional[Dict[str, np.ndarray]]:
+        unique = list(dict.fromkeys(texts))
+        start = time.perf_counter()
+        embeddings = embedding_service.get_embeddings_batch(unique, batch_size=len(unique))
+        self.encode_ms.observe((time.perf_counter() - start) * 1000)
+        if embeddings is None:
+            return None
+        return dict(zip(unique, embeddings))
+
+    def _resolve(self, batch: List[Tuple[str, asyncio.Future, float]], done: asyncio.Future):
+        try:
+            vectors = done.result()
+        except Exception as e:
+            logger.error(f"Coalesced embedding batch of {len(batch)} failed: {e}")
+            vectors = None
+        for text, future, _ in batch:
+            if not future.done():
+                future.set_result(vectors.get(text) if vectors is not None else None)
+        if done.get_loop() is not self._loop:
+            return  # batch from a replaced event loop
+        self.inflight -= 1
+        if self.pending and not self.inflight:
+            self._flush()  # texts queued during the encode have waited long enough
+
+    def stats(self) -> dict:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "inflight": self.inflight,
+            "batch_size": self.batch_sizes.snapshot(),
+            "wait_ms": self.wait_ms.snapshot(),
+            "encode_ms": self.encode_ms.snapshot()
+        }
+
+embedding_coalescer = EmbeddingCoalescer()
+
+async def get_query_embedding_async(text: str) -> Optional[np.ndarray]:
+    """Embed a search query without blocking the event loop.
+
+    Local cache hits return immediately; the shared Redis tier is read
+    through the asyncio client. Misses are micro-batched with other
+    concurrent queries by the coalescer.
+    """
+    if not text or not isinstance(text, str):
+        logger.warning(f"Invalid text for embedding: {text}")
+        return None
+    normalized = query_embedding_cache.normalize(text)
+    embedding = await query_embedding_cache.aget(normalized)
+    if embedding is not None:
+        return embedding
+    if settings.EMBEDDING_COALESCE_ENABLED:
+        embedding = await embedding_coalescer.embed(normalized)
+    else:
+        embedding = await asyncio.to_thread(embedding_service.get_embeddings, normalized)
+    if embedding is not None:
+        await query_embedding_cache.aset(normalized, embedding)
+    return embedding
+
+def embedding_coalescer_stats() -> dict:
+    return embedding_coalescer.stats()
+
+def get_embeddings_batch(texts: List[str], batch_size: Optional[int] = None) -> Optional[np.ndarray]:
+    return embedding_service.get_embeddings_batch(texts, batch_size)
+
+def _init_worker(threads: int):
+    """Pin inference threads so pool workers don't oversubscribe the CPU"""
+    settings.EMBEDDING_THREADS = threads
+    if settings.EMBEDDING_BACKEND.lower() == "torch":
+        import torch
+        torch.set_num_threads(threads)
+
+def _encode_shard(texts: List[str], batch_size: int) -> Optional[np.ndarray]:
+    return embedding_service.get_embeddings_batch(texts, batch_size)
+
+class EmbeddingWorkerPool:
+    """Shards batched encodes across CPU worker processes.
+
+    With ``workers`` <= 1 everything is encoded in-process. Workers are
+    spawned (not forked) so each loads its own copy of the model without
+    inheriting torch's thread state.
+    """
+
+    def __init__(self, workers: int = 0, batch_size: Optional[int] = None):
+        self.workers = workers
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.executor = None
+        if workers > 1:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads,)
+            )
+            logger.info(f"Started {workers} embedding workers with {threads} threads each")
+
+    def encode(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Embed texts, splitting them into one shard per worker"""
+        if not texts:
+            return None
+        if self.executor is None or len(texts) <= self.batch_size:
+            return get_embeddings_batch(texts, self.batch_size)
+
+        shard_size = -(-len(texts) // self.workers)
+        shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+        try:
+            results = list(self.executor.map(_encode_shard, shards, [self.batch_size] * len(shards)))
+        except Exception as e:
+            logger.error(f"Embedding worker pool failed: {e}")
+            return None
+        if any(r is None for r in results):
+            logger.error("One or more embedding shards failed")
+            return None
+        return np.vstack(results)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
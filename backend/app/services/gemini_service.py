@@ -1,37 +1,93 @@
-import os
 import asyncio
-import google.generativeai as genai
+import threading
+from typing import AsyncIterator, Optional
+from backend.app.services.generation_backends import GenerationBackend, get_generation_backend
 from backend.app.utils.logger import logger
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+_backend: Optional[GenerationBackend] = None
+_backend_lock = threading.Lock()
 
-# Configure Gemini API
-try:
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    logger.info("Gemini API configured successfully")
-except Exception as e:
-    logger.error(f"Failed to configure Gemini API: {e}")
-    raise
+def get_backend() -> GenerationBackend:
+    """Configure the generation backend selected in settings on first use"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                try:
+                    _backend = get_generation_backend()
+                except Exception as e:
+                    logger.error(f"Failed to configure generation backend: {e}")
+                    raise
+    return _backend
+
+EMPTY_RESPONSE_MESSAGE = "Sorry, I couldn't generate a response. Please try again."
+ERROR_RESPONSE_MESSAGE = "Sorry, I encountered an error while generating a response."
+FALLBACK_RESPONSES = (EMPTY_RESPONSE_MESSAGE, ERROR_RESPONSE_MESSAGE)
+
+def build_prompt(question: str, context: str) -> str:
+    return f"Question: {question}\n\nContext:\n{context}\n\nAnswer the question based on the provided context in a concise manner."
 
 async def generate_response(question: str, context: str) -> str:
-    """Generate a response using Gemini API with a timeout"""
+    """Generate a response with the configured backend"""
+    backend = get_backend()
     try:
-        prompt = f"Question: {question}\n\nContext:\n{context}\n\nAnswer the question based on the provided context in a concise manner."
-        logger.debug(f"Sending prompt to Gemini API: {prompt[:100]}...")
+        prompt = build_prompt(question, context)
+        logger.debug(f"Sending prompt to {backend.name} backend: {prompt[:100]}...")
 
-        # Use Gemini API with a timeout
-        response = await asyncio.to_thread(model.generate_content, prompt)
-        if not response or not response.text:
-            logger.error("Gemini API returned empty response")
-            return "Sorry, I couldn't generate a response. Please try again."
+        text = await asyncio.to_thread(backend.generate, prompt)
+        if not text:
+            logger.error(f"{backend.name} backend returned empty response")
+            return EMPTY_RESPONSE_MESSAGE
 
-        logger.debug("Successfully generated response from Gemini API")
-        return response.text.strip()
+        logger.debug(f"Successfully generated response from {backend.name} backend")
+        return text.strip()
 
     except Exception as e:
-        logger.error(f"Error generating response with Gemini API: {e}")
-        return "Sorry, I encountered an error while generating a response."
\ No newline at end of file
+        logger.error(f"Error generating response with {backend.name} backend: {e}")
+        return ERROR_RESPONSE_MESSAGE
+
+async def stream_response(question: str, context: str) -> AsyncIterator[str]:
+    """Yield response text from the backend as it is generated.
+
+    The blocking streaming iterator runs in a worker thread and hands chunks
+    to the event loop through a queue. Failures before any text was produced
+    yield the same fallback messages as generate_response. A failure after
+    that is re-raised, so callers do not mistake the partial text for a
+    complete answer.
+    """
+    backend = get_backend()
+    prompt = build_prompt(question, context)
+    logger.debug(f"Streaming prompt to {backend.name} backend: {prompt[:100]}...")
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    def produce():
+        try:
+            for text in backend.stream(prompt):
+                if text:
+                    loop.call_soon_threadsafe(queue.put_nowait, text)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+    loop.run_in_executor(None, produce)
+    emitted = False
+    while True:
+        item = await queue.get()
+        if item is finished:
+            break
+        if isinstance(item, Exception):
+            logger.error(f"Error streaming response from {backend.name} backend: {item}")
+            if emitted:
+                raise item
+            emitted = True
+            yield ERROR_RESPONSE_MESSAGE
+            break
+        emitted = True
+        yield item
+
+    if not emitted:
+        logger.error(f"{backend.name} backend returned empty response")
+        yield EMPTY_RESPONSE_MESSAGE
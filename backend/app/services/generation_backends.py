@@ -0,0 +1,88 @@
+import os
+import re
+import time
+from typing import Iterator, Optional
+from backend.app.config import settings
+from backend.app.utils.logger import logger
+
+class GenerationBackend:
+    """Blocking text generation interface.
+
+    Callers run these methods in a worker thread; ``stream`` yields text
+    chunks as the backend produces them.
+    """
+
+    name = "base"
+
+    def generate(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        yield self.generate(prompt)
+
+class GeminiBackend(GenerationBackend):
+    name = "gemini"
+
+    def __init__(self, model_name: Optional[str] = None, api_key: Optional[str] = None):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key or settings.GEMINI_API_KEY or os.getenv("GEMINI_API_KEY"))
+        self.model_name = model_name or settings.GEMINI_MODEL
+        self.model = genai.GenerativeModel(self.model_name)
+        logger.info(f"Gemini API configured successfully with model {self.model_name}")
+
+    def generate(self, prompt: str) -> str:
+        response = self.model.generate_content(prompt)
+        return response.text if response and response.text else ""
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self.model.generate_content(prompt, stream=True):
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+class StubBackend(GenerationBackend):
+    """Deterministic offline backend for load testing the RAG path.
+
+    Waits ``latency_ms`` before the first token, then emits words from the
+    prompt's context at ``tokens_per_second``. The same prompt always
+    produces the same answer.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency_ms: Optional[int] = None, tokens_per_second: Optional[float] = None,
+                 max_tokens: Optional[int] = None):
+        self.latency = (settings.STUB_LATENCY_MS if latency_ms is None else latency_ms) / 1000
+        self.tokens_per_second = settings.STUB_TOKENS_PER_SECOND if tokens_per_second is None else tokens_per_second
+        self.max_tokens = settings.STUB_MAX_TOKENS if max_tokens is None else max_tokens
+        logger.info(f"Using stub generation backend ({self.latency * 1000:.0f}ms latency, "
+                    f"{self.tokens_per_second} tokens/s)")
+
+    def _tokens(self, prompt: str):
+        _, _, context = prompt.partition("Context:")
+        words = re.findall(r"\S+", context or prompt)[:self.max_tokens]
+        return ["Based on the provided context:"] + [f" {word}" for word in words]
+
+    def generate(self, prompt: str) -> str:
+        return "".join(self.stream(prompt))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        time.sleep(self.latency)
+        delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for token in self._tokens(prompt):
+            if delay:
+                time.sleep(delay)
+            yield token
+
+BACKENDS = {
+    GeminiBackend.name: GeminiBackend,
+    StubBackend.name: StubBackend,
+}
+
+def get_generation_backend(name: Optional[str] = None) -> GenerationBackend:
+    """Instantiate the backend selected by ``settings.GENERATION_BACKEND``"""
+    name = (name or settings.GENERATION_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown generation backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
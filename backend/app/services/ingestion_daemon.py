@@ -0,0 +1,303 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from backend.app.config import settings
+from backend.app.services.embedding_service import EmbeddingWorkerPool
+from backend.app.services.ingestion_service import IngestionService, article_key
+from backend.app.services.news_service import NewsService
+from backend.app.utils.helpers import hash_text
+from backend.app.utils.logger import logger
+
+SEEN_PER_FEED = 1000  # Recently committed entries remembered per feed
+
+def entry_token(article: Dict[str, Any]) -> str:
+    """Identity of a feed entry's revision: a republished entry gets a new token"""
+    return hash_text(f"{article['url']}\x1f{article.get('published_date', '')}")[:16]
+
+class FeedSchedule:
+    """Polling state for one feed.
+
+    The interval halves after a poll that found new entries and grows by
+    half after one that found none, within the configured bounds, so busy
+    feeds are polled every few minutes and quiet ones back off.
+    """
+
+    def __init__(self, url: str, interval: Optional[float] = None, next_poll: float = 0.0,
+                 seen: Optional[List[str]] = None):
+        self.url = url
+        self.interval = interval or settings.INGEST_POLL_MIN_SECONDS
+        self.next_poll = next_poll
+        self.seen: Deque[str] = deque(seen or [], maxlen=SEEN_PER_FEED)
+        self._seen_set: Set[str] = set(self.seen)
+        self.polled = False  # first poll after start is unconditional
+        self.outstanding: Set[str] = set()  # entries of the last poll not yet written
+        self.clean = True  # no entry of the last poll failed
+
+    def adapt(self, new_entries: int):
+        factor = 0.5 if new_entries else 1.5
+        self.interval = min(max(self.interval * factor, settings.INGEST_POLL_MIN_SECONDS),
+                            settings.INGEST_POLL_MAX_SECONDS)
+        self.next_poll = time.time() + self.interval
+
+    def is_seen(self, token: str) -> bool:
+        return token in self._seen_set
+
+    def mark_seen(self, token: str):
+        if token in self._seen_set:
+            return
+        if len(self.seen) == self.seen.maxlen:
+            self._seen_set.discard(self.seen[0])
+        self.seen.append(token)
+        self._seen_set.add(token)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"interval": self.interval, "next_poll": self.next_poll, "seen": list(self.seen)}
+
+class IngestionDaemon:
+    """Keeps the index fresh by polling feeds continuously.
+
+    Stages run as asyncio tasks joined by bounded queues:
+
+        scheduler -> fetch_queue -> extract/chunk workers -> write_queue -> writer
+
+    A full queue blocks its producer, so a slow embedding stage holds back
+    fetching instead of piling articles up in memory. The writer embeds and
+    stores a batch through IngestionService in a worker thread. Only the
+    entries IngestionService reports as stored are then marked as seen in
+    the checkpoint. An entry that failed to store, or was lost to a crash
+    or shutdown, is therefore picked up again by a later poll or run. A
+    feed's new ETag/Last-Modified validators are kept only once every
+    entry of its poll is stored, and the feed is not polled again before
+    then; after a failure the next poll refetches it in full.
+    """
+
+    def __init__(self, redis_client, collection: Any, pool: EmbeddingWorkerPool,
+                 news_service: Optional[NewsService] = None, checkpoint_path: Optional[str] = None):
+        self.redis_client = redis_client
+        self.collection = collection
+        self.pool = pool
+        self.news_service = news_service or NewsService()
+        self.checkpoint_path = checkpoint_path or os.path.join(settings.DATA_DIR, settings.INGEST_CHECKPOINT_FILE)
+        self.fetch_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGEST_QUEUE_SIZE)
+        self.write_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGEST_QUEUE_SIZE)
+        self.stopping = asyncio.Event()
+        self.in_flight: Set[str] = set()
+        self.last_maintenance = 0.0
+        self.schedules = self._load_checkpoint()
+        self.totals = {"polls": 0, "articles": 0, "updated": 0, "duplicates": 0, "failed": 0}
+
+    # -- checkpoint --------------------------------------------------------
+
+    def _load_checkpoint(self) -> Dict[str, FeedSchedule]:
+        state: Dict[str, Any] = {}
+        try:
+            if os.path.exists(self.checkpoint_path):
+                with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                logger.info(f"Resuming ingestion from checkpoint {self.checkpoint_path}")
+        except Exception as e:
+            logger.warning(f"Could not load ingestion checkpoint {self.checkpoint_path}, starting fresh: {e}")
+        self.last_maintenance = state.get("last_maintenance", 0.0)
+        feeds = state.get("feeds", {})
+        return {url: FeedSchedule(url, **feeds.get(url, {})) for url in self.news_service.sources}
+
+    def save_checkpoint(self):
+        """Write the checkpoint atomically so a crash never leaves a torn file"""
+        state = {
+            "feeds": {url: schedule.to_dict() for url, schedule in self.schedules.items()},
+            "last_maintenance": self.last_maintenance
+        }
+        try:
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.checkpoint_path)
+        except Exception as e:
+            logger.error(f"Failed to save ingestion checkpoint {self.checkpoint_path}: {e}")
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def stop(self):
+        if not self.stopping.is_set():
+            logger.info("Stopping ingestion daemon, draining queues...")
+            self.stopping.set()
+
+    async def run(self):
+        try:
+            ingestion = IngestionService(self.redis_client, self.collection, self.pool)
+            await asyncio.to_thread(ingestion.migrate_records)
+        except Exception as e:
+            logger.error(f"Article record migration failed: {e}")
+        extract_workers = [asyncio.create_task(self._extract_worker()) for _ in range(settings.INGEST_EXTRACT_TASKS)]
+        writer = asyncio.create_task(self._writer())
+        scheduler = asyncio.create_task(self._scheduler())
+        logger.info(f"Ingestion daemon started for {len(self.schedules)} feeds")
+        try:
+            await self.stopping.wait()
+        finally:
+            # Stop producing, let queued articles through, then unwind stage by stage
+            scheduler.cancel()
+            await asyncio.gather(scheduler, return_exceptions=True)
+            try:
+                await asyncio.wait_for(self._drain(extract_workers, writer), timeout=settings.INGEST_DRAIN_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"Queues not drained within {settings.INGEST_DRAIN_SECONDS}s; "
+                               f"unsaved entries will be refetched on restart")
+                for task in (*extract_workers, writer):
+                    task.cancel()
+                await asyncio.gather(*extract_workers, writer, return_exceptions=True)
+            self.save_checkpoint()
+            await self.news_service.close()
+            logger.info(f"Ingestion daemon stopped: {self.totals}")
+
+    async def _drain(self, extract_workers: List[asyncio.Task], writer: asyncio.Task):
+        for _ in extract_workers:
+            await self.fetch_queue.put(None)
+        await asyncio.gather(*extract_workers)
+        await self.write_queue.put(None)
+        await writer
+
+    # -- stages ------------------------------------------------------------
+
+    async def _scheduler(self):
+        polls: Set[asyncio.Task] = set()
+        try:
+            while True:
+                now = time.time()
+                for schedule in self.schedules.values():
+                    # A feed is not polled again until its last poll's entries are written
+                    if (schedule.next_poll <= now and not schedule.outstanding
+                            and not any(t.get_name() == schedule.url for t in polls)):
+                        task = asyncio.create_task(self._poll(schedule), name=schedule.url)
+                        polls.add(task)
+                        task.add_done_callback(polls.discard)
+                wake = min(s.next_poll for s in self.schedules.values())
+                await asyncio.sleep(max(1.0, wake - time.time()))
+        finally:
+            for task in polls:
+                task.cancel()
+            await asyncio.gather(*polls, return_exceptions=True)
+
+    async def _poll(self, schedule: FeedSchedule):
+        # Push the next poll out first so a slow fetch is not started twice
+        schedule.next_poll = time.time() + schedule.interval
+        articles = await self.news_service.fetch_feed(schedule.url, conditional=schedule.polled)
+        schedule.polled = True
+        self.totals["polls"] += 1
+
+        new = []
+        for article in articles:
+            token = entry_token(article)
+            if not schedule.is_seen(token) and token not in self.in_flight:
+                self.in_flight.add(token)
+                new.append(article)
+        schedule.adapt(len(new))
+        schedule.outstanding.update(entry_token(article) for article in new)
+        if not new:
+            self.news_service.commit_feed_state([schedule.url])
+        logger.info(f"Polled {schedule.url}: {len(new)} new of {len(articles)}, "
+                    f"next poll in {schedule.interval:.0f}s")
+        for article in new:
+            await self.fetch_queue.put(article)  # blocks while downstream is behind
+
+    async def _extract_worker(self):
+        while True:
+            article = await self.fetch_queue.get()
+            if article is None:
+                return
+            try:
+                await self.news_service.extract_full_text([article])
+                self.news_service.chunk_article(article)
+            except Exception as e:
+                logger.error(f"Failed to prepare article {article.get('url')}: {e}")
+                self._settle(article, stored=False)
+                continue
+            if article["chunks"]:
+                await self.write_queue.put(article)
+            else:
+                self._settle(article, stored=True)  # nothing to index
+
+    async def _next_batch(self) -> Optional[List[Dict[str, Any]]]:
+        """Collect articles until a chunk batch fills or the flush interval
+        passes; None once the queue is closed and empty"""
+        first = await self.write_queue.get()
+        if first is None:
+            return None
+        batch, chunks = [first], len(first["chunks"])
+        deadline = time.monotonic() + settings.INGEST_FLUSH_SECONDS
+        while chunks < settings.INGEST_BATCH_SIZE:
+            try:
+                article = await asyncio.wait_for(self.write_queue.get(), timeout=max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                break
+            if article is None:
+                # Hand the close marker back so the next call ends the writer
+                self.write_queue.put_nowait(None)
+                break
+            batch.append(article)
+            chunks += len(article["chunks"])
+        return batch
+
+    async def _writer(self):
+        while True:
+            batch = await self._next_batch()
+            if batch is None:
+                return
+            await self._write(batch)
+            if time.time() - self.last_maintenance >= settings.INGEST_MAINTENANCE_SECONDS:
+                await self._maintain()
+
+    def _settle(self, article: Dict[str, Any], stored: bool):
+        """Finish an entry: mark it seen if stored, and once every entry of
+        its feed's last poll is settled without failure, keep the
+        validators of that poll"""
+        token = entry_token(article)
+        self.in_flight.discard(token)
+        schedule = self.schedules.get(article.get("source"))
+        if schedule is None:
+            return
+        if stored:
+            schedule.mark_seen(token)
+        else:
+            schedule.clean = False
+        schedule.outstanding.discard(token)
+        if not schedule.outstanding:
+            # After a failure the old validators stay, so the next poll refetches the feed
+            if schedule.clean:
+                self.news_service.commit_feed_state([schedule.url])
+            schedule.clean = True
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        try:
+            # A fresh service per batch keeps its per-run state from growing
+            ingestion = IngestionService(self.redis_client, self.collection, self.pool)
+            report = await asyncio.to_thread(ingestion.ingest, batch, True)
+        except Exception as e:
+            logger.error(f"Failed to ingest batch of {len(batch)} articles, will retry on a later poll: {e}")
+            for article in batch:
+                self._settle(article, stored=False)
+            return
+        # Articles whose chunks failed to store stay unseen and are retried on a later poll
+        for article in batch:
+            self._settle(article, stored=article_key(article["url"]) in ingestion.stored_keys)
+        for field in ("updated", "duplicates", "failed"):
+            self.totals[field] += report[field]
+        self.totals["articles"] += len(batch)
+        self.save_checkpoint()
+        logger.info(f"Ingested batch of {len(batch)} articles: {report}")
+
+    async def _maintain(self):
+        """Apply retention and rebuild backend search structures"""
+        self.last_maintenance = time.time()
+        try:
+            ingestion = IngestionService(self.redis_client, self.collection, self.pool)
+            pruned = await asyncio.to_thread(ingestion.prune)
+            await asyncio.to_thread(self.collection.optimize)
+            logger.info(f"Ingestion maintenance done, pruned {pruned} articles")
+        except Exception as e:
+            logger.error(f"Ingestion maintenance failed: {e}")
+        self.save_checkpoint()
@@ -0,0 +1,479 @@
+import json
+import time
+import traceback
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from backend.app.config import settings
+from backend.app.database.lexical_index import LexicalIndex, lexical_index
+from backend.app.services.dedup_service import NearDuplicateIndex, decode_signature, encode_signature, minhash
+from backend.app.services.embedding_service import EmbeddingWorkerPool
+from backend.app.services.news_feed import RECENT_INDEX_KEY
+from backend.app.utils.helpers import hash_text, make_snippet, parse_published
+from backend.app.utils.logger import logger
+
+ARTICLE_KEY_PREFIX = "article:"
+ARTICLE_INDEX_KEY = "articles:ingested"  # sorted set of article keys by first-ingest time
+# Bumped when article records or chunk metadata gain fields; migrate_records() upgrades older ones
+RECORD_VERSION = "2"
+RECORD_VERSION_KEY = "articles:record_version"  # version every stored record was last migrated to
+MIGRATE_BATCH_SIZE = 200
+
+def article_key(url: str) -> str:
+    """Redis key for an article's metadata hash, stable across runs"""
+    return f"{ARTICLE_KEY_PREFIX}{hash_text(url)[:16]}"
+
+def chunk_id(url: str, chunk_idx: int) -> str:
+    return f"{url}-{chunk_idx}"
+
+def chunk_url(chunk_id: str) -> str:
+    """Article URL of a chunk ID built by ``chunk_id``"""
+    return chunk_id.rsplit("-", 1)[0]
+
+def _published_ts(article: Dict[str, Any]) -> float:
+    """Publication time of an article; undated articles get 0 so
+    date-range filters leave them out"""
+    return article.get("published_ts") or parse_published(article.get("published_date", "")) or 0.0
+
+def _decode(data: Dict[Any, Any]) -> Dict[str, str]:
+    return {
+        (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+        for k, v in data.items()
+    }
+
+class IngestionService:
+    """Embeds article chunks in batches and keeps Redis/ChromaDB in sync.
+
+    In incremental mode a content hash is kept per article and per chunk, so
+    only new or changed chunks are embedded and upserted. Stale chunks are
+    deleted only after their replacements are stored, so queries keep
+    working while a refresh is running.
+
+    Before staging, each article body gets a MinHash signature. Near-copies
+    of an article already indexed (the same wire story on another feed)
+    are not embedded; their URL and source are recorded on the canonical
+    article instead, and a stored copy of such an article is removed.
+
+    Articles published before the retention window are skipped outright,
+    since ``prune`` would only drop them again after they were embedded.
+    """
+
+    def __init__(self, redis_client, collection: Any, pool: EmbeddingWorkerPool, batch_size: Optional[int] = None,
+                 lexical: Optional[LexicalIndex] = None, dedup: Optional[NearDuplicateIndex] = None):
+        self.redis_client = redis_client
+        self.collection = collection
+        self.lexical = lexical or lexical_index
+        self.pool = pool
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.dedup = dedup or (NearDuplicateIndex(redis_client) if settings.DEDUP_ENABLED else None)
+        self.pending: List[Dict[str, Any]] = []
+        self.staged: Dict[str, Dict[str, Any]] = {}
+        self.failed: Set[str] = set()
+        self.signatures: Dict[str, Any] = {}
+        self.duplicates: Dict[str, List[Dict[str, str]]] = {}
+        self.stored_keys: Set[str] = set()  # keys of this run's articles that are now fully stored or expired
+
+    def ingest(self, articles: List[Dict[str, Any]], incremental: bool = True) -> Dict[str, int]:
+        """Store every article, returning counts for the ingestion report"""
+        report = {"articles": len(articles), "updated": 0, "unchanged": 0, "duplicates": 0, "expired": 0,
+                  "failed": 0, "chunks_stored": 0, "chunks_deleted": 0}
+        retention_days = settings.ARTICLE_RETENTION_DAYS
+        cutoff = time.time() - retention_days * 86400 if retention_days > 0 else 0.0
+        processed: Set[str] = set()
+        duplicate_of: Dict[str, str] = {}
+
+        for idx, article in enumerate(articles):
+            logger.info(f"\n=== Processing article {idx + 1}/{len(articles)} ===")
+            logger.info(f"Title: {article['title'][:50]}...")
+            key = article_key(article["url"])
+            processed.add(key)
+            try:
+                if 0 < _published_ts(article) < cutoff:
+                    # Settled: it would only be pruned again, so feeds and the daemon stop retrying it
+                    logger.debug(f"Article published before the retention window, skipping: {article['url']}")
+                    self.stored_keys.add(key)
+                    report["expired"] += 1
+                    continue
+                canonical = self._find_canonical(article)
+                if canonical:
+                    duplicate_of[key] = canonical
+                    report["duplicates"] += 1
+                    report["chunks_deleted"] += self._collapse_stored(key, canonical)
+                    continue
+                if not self._stage_article(article, idx, incremental):
+                    if key not in self.staged:
+                        self.stored_keys.add(key)
+                    report["unchanged"] += 1
+                    continue
+            except Exception as e:
+                logger.error(f"Article processing failed for article {idx}: {article.get('title', 'Untitled')}: {e}")
+                logger.error(traceback.format_exc())
+                report["failed"] += 1
+                continue
+
+            if len(self.pending) >= self.batch_size:
+                report["chunks_stored"] += self._flush()
+
+        report["chunks_stored"] += self._flush()
+        self._commit_articles(report)
+        # A near-copy is covered once its canonical is stored, by this run or an earlier one
+        self.stored_keys.update(
+            key for key, canonical in duplicate_of.items()
+            if canonical in self.stored_keys or canonical not in processed
+        )
+        return report
+
+    def _find_canonical(self, article: Dict[str, Any]) -> Optional[str]:
+        """Return the key of an indexed near-copy of this article, recording
+        the article as its duplicate; otherwise index its signature"""
+        key = article_key(article["url"])
+        signature = minhash(article.get("content") or " ".join(article["chunks"])) if self.dedup else None
+        if signature is None:
+            return None
+        canonical = self.dedup.find(key, signature)
+        if canonical is None:
+            self.signatures[key] = signature
+            self.dedup.add_local(key, signature)
+            return None
+        self.duplicates.setdefault(canonical, []).append(
+            {"url": article["url"], "source": article.get("source", "unknown"), "title": article["title"]}
+        )
+        logger.info(f"Near-duplicate of {canonical}, not embedding: {article['url']}")
+        return canonical
+
+    def _collapse_stored(self, key: str, canonical: str) -> int:
+        """Drop the stored copy of an article that turned out to be a
+        near-duplicate of ``canonical``, returning its deleted chunk count.
+
+        Near-copies it had collected move over to the canonical article.
+        """
+        data = _decode(self.redis_client.hgetall(key))
+        if not data:
+            return 0
+        self._delete_article(key, data)
+        self.duplicates[canonical].extend(json.loads(data.get("duplicates", "[]")))
+        logger.info(f"Collapsed stored article {key} into near-duplicate {canonical}: {data.get('title', '')}")
+        return int(data.get("chunk_count", 0))
+
+    def prune(self, current_keys: Optional[Iterable[str]] = None, retention_days: Optional[int] = None,
+              sources: Optional[Iterable[str]] = None) -> int:
+        """Delete articles that passed the retention window or, when the
+        keys of every article currently in the feeds are given, that no
+        longer appear in any feed.
+
+        Retention counts from first ingest, and on a partitioned store also
+        removes every article whose partition expired by publication time.
+
+        ``sources`` names the feeds those keys were fully listed from. An
+        article with a copy from any other feed is kept, since a failed
+        fetch would otherwise look like the article was withdrawn.
+        """
+        retention_days = settings.ARTICLE_RETENTION_DAYS if retention_days is None else retention_days
+        doomed: Set[str] = set()
+
+        if retention_days > 0:
+            cutoff = time.time() - retention_days * 86400
+            drop_partitions = getattr(self.collection, "drop_partitions", None)
+            if drop_partitions is not None:
+                # Partitioned stores shed old periods whole, by publication time. The articles
+                # whose chunks went with them are removed below, or later runs would see their
+                # hashes, skip them as unchanged and never embed them again.
+                dropped = drop_partitions(cutoff)
+                if dropped:
+                    self.lexical.delete(dropped)
+                    doomed.update(article_key(url) for url in {chunk_url(cid) for cid in dropped})
+            doomed.update(k.decode() for k in self.redis_client.zrangebyscore(ARTICLE_INDEX_KEY, 0, cutoff))
+        if current_keys is not None:
+            doomed.update(self._missing(set(current_keys), None if sources is None else set(sources)))
+
+        removed = 0
+        for key in doomed:
+            try:
+                data = self._delete_article(key, _decode(self.redis_client.hgetall(key)))
+                removed += 1
+                logger.debug(f"Pruned article {key}: {data.get('title', '')}")
+            except Exception as e:
+                logger.error(f"Failed to prune article {key}: {e}")
+
+        if removed:
+            logger.info(f"Pruned {removed} articles")
+        return removed
+
+    def _delete_article(self, key: str, data: Dict[str, str]) -> Dict[str, str]:
+        """Remove a stored article's chunks, record and index entries,
+        returning its decoded record"""
+        if data.get("url"):
+            ids = [chunk_id(data["url"], i) for i in range(int(data.get("chunk_count", 0)))]
+            if ids:
+                self.collection.delete(ids=ids)
+                self.lexical.delete(ids)
+        pipe = self.redis_client.pipeline()
+        pipe.delete(key)
+        pipe.zrem(ARTICLE_INDEX_KEY, key)
+        pipe.zrem(RECENT_INDEX_KEY, key)
+        if data.get("minhash"):
+            NearDuplicateIndex.unindex(pipe, key, decode_signature(data["minhash"]))
+        pipe.execute()
+        return data
+
+    def migrate_records(self) -> int:
+        """Upgrade articles stored under an older RECORD_VERSION in place.
+
+        Each record gets ``published_ts``, a ``snippet`` from its stored
+        first chunk and a ``news:recent`` entry. Its chunks are re-upserted
+        with their stored vectors and ``published_ts`` added to their
+        metadata. Nothing is re-embedded. Runs once per version; returns
+        the number of articles upgraded.
+        """
+        version = self.redis_client.get(RECORD_VERSION_KEY)
+        if (version.decode() if isinstance(version, bytes) else version) == RECORD_VERSION:
+            return 0
+        entries = [(k.decode(), score) for k, score in self.redis_client.zrange(ARTICLE_INDEX_KEY, 0, -1, withscores=True)]
+        migrated = 0
+        for start in range(0, len(entries), MIGRATE_BATCH_SIZE):
+            group = entries[start:start + MIGRATE_BATCH_SIZE]
+            pipe = self.redis_client.pipeline()
+            for key, _ in group:
+                pipe.hgetall(key)
+            records = [(key, ingested, _decode(data)) for (key, ingested), data in zip(group, pipe.execute())]
+            records = [r for r in records if r[2].get("url") and r[2].get("version") != RECORD_VERSION]
+            if records:
+                self._migrate_group(records)
+                migrated += len(records)
+        self.redis_client.set(RECORD_VERSION_KEY, RECORD_VERSION)
+        if migrated:
+            logger.info(f"Migrated {migrated} article records to version {RECORD_VERSION}")
+        return migrated
+
+    def _migrate_group(self, records: List[tuple]):
+        published = {
+            key: float(data.get("published_ts") or parse_published(data.get("published_date", "")) or 0.0)
+            for key, _, data in records
+        }
+        ids = [chunk_id(data["url"], i) for _, _, data in records for i in range(int(data.get("chunk_count", 0)))]
+        stored = self.collection.get(ids=ids, include=["documents", "metadatas", "embeddings"]) if ids else {"ids": []}
+        embeddings = stored.get("embeddings")
+        if embeddings is None or not len(embeddings):
+            embeddings = [None] * len(stored["ids"])
+        first_chunks = {}
+        rows = {"ids": [], "embeddings": [], "documents": [], "metadatas": []}
+        for cid, document, metadata, embedding in zip(stored["ids"], stored.get("documents") or [],
+                                                      stored.get("metadatas") or [], embeddings):
+            url = chunk_url(cid)
+            key = article_key(url)
+            if cid == chunk_id(url, 0):
+                first_chunks[key] = document or ""
+            if embedding is not None and (metadata or {}).get("published_ts") is None and key in published:
+                rows["ids"].append(cid)
+                rows["embeddings"].append([float(x) for x in embedding])
+                rows["documents"].append(document)
+                rows["metadatas"].append(dict(metadata or {}, published_ts=published[key]))
+        if rows["ids"]:
+            self.collection.upsert(**rows)
+
+        pipe = self.redis_client.pipeline()
+        for key, ingested, data in records:
+            pipe.hset(key, mapping={
+                "published_ts": str(published[key]),
+                "snippet": data.get("snippet") or make_snippet(first_chunks.get(key, "")),
+                "version": RECORD_VERSION
+            })
+            # Undated articles sort by when they were first ingested, as in _commit_articles
+            pipe.zadd(RECENT_INDEX_KEY, {key: published[key] or ingested})
+        pipe.execute()
+
+    def _missing(self, current: Set[str], sources: Optional[Set[str]]) -> Set[str]:
+        """Indexed articles none of whose copies is among ``current``"""
+        candidates = [k.decode() for k in self.redis_client.zrange(ARTICLE_INDEX_KEY, 0, -1)]
+        candidates = [key for key in candidates if key not in current]
+        if not candidates:
+            return set()
+        pipe = self.redis_client.pipeline()
+        for key in candidates:
+            pipe.hmget(key, ["url", "source", "duplicates"])
+        missing = set()
+        for key, values in zip(candidates, pipe.execute()):
+            url, source, duplicates = (v.decode() if isinstance(v, bytes) else v for v in values)
+            if url is None:
+                missing.add(key)  # index entry left behind by a lost record
+                continue
+            copies = [{"url": url, "source": source}] + json.loads(duplicates or "[]")
+            if any(article_key(copy["url"]) in current for copy in copies):
+                continue  # a near-copy on another feed keeps the canonical article alive
+            if sources is not None and any(copy["source"] not in sources for copy in copies):
+                continue
+            missing.add(key)
+        return missing
+
+    def _stage_article(self, article: Dict[str, Any], idx: int, incremental: bool) -> bool:
+        """Queue changed chunks for embedding; returns False if nothing changed"""
+        key = article_key(article["url"])
+        if key in self.staged:
+            logger.debug(f"Article already staged in this run, skipping: {article['url']}")
+            return False
+        published_date = article.get("published_date", "")
+        published_ts = _published_ts(article)
+        chunk_hashes = [
+            hash_text(f"{article['title']}\x1f{published_date}\x1f{chunk}") for chunk in article["chunks"]
+        ]
+        content_hash = hash_text("".join(chunk_hashes))
+
+        previous_hashes: List[str] = []
+        previous_signature = None
+        if incremental:
+            existing = _decode(self.redis_client.hgetall(key))
+            if existing.get("content_hash") == content_hash:
+                logger.debug(f"Article unchanged, skipping: {article['title']}")
+                if self.dedup and key in self.signatures and not existing.get("minhash"):
+                    self._backfill_signature(key)
+                return False
+            previous_hashes = json.loads(existing.get("chunk_hashes", "[]"))
+            previous_signature = decode_signature(existing["minhash"]) if existing.get("minhash") else None
+
+        records = []
+        for chunk_idx, chunk in enumerate(article["chunks"]):
+            if not chunk.strip():
+                logger.debug(f"Skipping empty chunk {chunk_idx} for article {article['title']}")
+                continue
+            if chunk_idx < len(previous_hashes) and previous_hashes[chunk_idx] == chunk_hashes[chunk_idx]:
+                continue
+            records.append({
+                "key": key,
+                "id": chunk_id(article["url"], chunk_idx),
+                "document": chunk,
+                "metadata": {
+                    "title": article["title"],
+                    "url": article["url"],
+                    "published_date": published_date,
+                    "published_ts": float(published_ts),
+                    "source": article.get("source", "unknown"),
+                    "chunk_index": chunk_idx,
+                    "article_index": idx,
+                    "chunk_hash": chunk_hashes[chunk_idx]
+                }
+            })
+
+        self.pending.extend(records)
+        mapping = {
+            "title": article["title"],
+            "url": article["url"],
+            "published_date": published_date,
+            "published_ts": str(float(published_ts)),
+            "source": article.get("source", "unknown"),
+            "snippet": make_snippet(article["chunks"][0]) if article["chunks"] else "",
+            "chunk_count": str(len(article["chunks"])),
+            "content_hash": content_hash,
+            "chunk_hashes": json.dumps(chunk_hashes),
+            "version": RECORD_VERSION
+        }
+        if key in self.signatures:
+            mapping["minhash"] = encode_signature(self.signatures[key])
+        self.staged[key] = {
+            "mapping": mapping,
+            "previous_signature": previous_signature,
+            "stale_ids": [chunk_id(article["url"], i) for i in range(len(chunk_hashes), len(previous_hashes))],
+            "changed_chunks": len(records)
+        }
+        logger.debug(f"Staged {len(records)}/{len(chunk_hashes)} changed chunks for article {idx}: {article['title']}")
+        return True
+
+    def _backfill_signature(self, key: str):
+        """Index an article stored before deduplication was enabled"""
+        signature = self.signatures[key]
+        pipe = self.redis_client.pipeline()
+        pipe.hset(key, "minhash", encode_signature(signature))
+        self.dedup.index(pipe, key, signature)
+        pipe.execute()
+
+    def _flush(self) -> int:
+        """Embed pending chunks in one pass and write them with one bulk upsert"""
+        if not self.pending:
+            return 0
+        batch, self.pending = self.pending, []
+        try:
+            embeddings = self.pool.encode([r["document"] for r in batch])
+            if embeddings is None:
+                raise ValueError("embedding returned no vectors")
+
+            self.collection.upsert(
+                embeddings=embeddings.tolist(),
+                documents=[r["document"] for r in batch],
+                metadatas=[r["metadata"] for r in batch],
+                ids=[r["id"] for r in batch]
+            )
+            self.lexical.upsert([r["id"] for r in batch], [r["document"] for r in batch])
+            logger.debug(f"Stored batch of {len(batch)} chunks")
+            return len(batch)
+
+        except Exception as e:
+            logger.error(f"Batch storage error for {len(batch)} chunks: {e}")
+            logger.debug(traceback.format_exc())
+            self.failed.update(r["key"] for r in batch)
+            return 0
+
+    def _commit_articles(self, report: Dict[str, int]):
+        """Record hashes for fully stored articles, then drop their stale chunks.
+
+        Articles with a failed batch keep their previous hashes and are left
+        out of ``stored_keys``. Callers keep the feed's old validators for
+        them, so the next fetch returns them again and they are retried.
+        """
+        now = time.time()
+        for key, staged in self.staged.items():
+            title = staged["mapping"]["title"]
+            if key in self.failed:
+                logger.warning(f"Failed to store chunks for article: {title}")
+                report["failed"] += 1
+                continue
+            try:
+                if staged["stale_ids"]:
+                    self.collection.delete(ids=staged["stale_ids"])
+                    self.lexical.delete(staged["stale_ids"])
+                    report["chunks_deleted"] += len(staged["stale_ids"])
+                pipe = self.redis_client.pipeline()
+                pipe.hset(key, mapping=staged["mapping"])
+                pipe.zadd(ARTICLE_INDEX_KEY, {key: now}, nx=True)
+                published_ts = float(staged["mapping"]["published_ts"])
+                if published_ts:
+                    pipe.zadd(RECENT_INDEX_KEY, {key: published_ts})
+                else:
+                    # Undated articles sort by when they were first seen
+                    pipe.zadd(RECENT_INDEX_KEY, {key: now}, nx=True)
+                if self.dedup and key in self.signatures:
+                    self.dedup.index(pipe, key, self.signatures[key], staged["previous_signature"])
+                pipe.execute()
+                self.stored_keys.add(key)
+                report["updated"] += 1
+                logger.info(f"Processed {staged['changed_chunks']}/{staged['mapping']['chunk_count']} changed chunks for article: {title}")
+            except Exception as e:
+                logger.error(f"Failed to record article {key}: {title}: {e}")
+                report["failed"] += 1
+        self._record_duplicates()
+        self.staged.clear()
+        self.failed.clear()
+        self.duplicates.clear()
+
+    def _record_duplicates(self):
+        """Merge this run's near-copies into each canonical article's
+        ``duplicates`` list and ``sources`` set"""
+        keys = [key for key in self.duplicates if key not in self.failed]
+        if not keys:
+            return
+        try:
+            pipe = self.redis_client.pipeline()
+            for key in keys:
+                pipe.hmget(key, ["url", "source", "duplicates"])
+            current = pipe.execute()
+
+            pipe = self.redis_client.pipeline()
+            for key, (url, source, stored) in zip(keys, current):
+                if url is None:
+                    continue  # canonical was pruned or never committed
+                duplicates = {d["url"]: d for d in json.loads(stored or "[]")}
+                duplicates.update((d["url"], d) for d in self.duplicates[key])
+                sources = sorted({source.decode() if isinstance(source, bytes) else source}
+                                 | {d["source"] for d in duplicates.values()})
+                pipe.hset(key, mapping={"duplicates": json.dumps(list(duplicates.values())),
+                                        "sources": json.dumps(sources)})
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to record near-duplicate articles: {e}")
@@ -0,0 +1,77 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+RECENT_INDEX_KEY = "news:recent"  # sorted set of article keys by publication time
+FEED_FIELDS = ("title", "url", "source", "published_date", "published_ts", "snippet", "sources")
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(score: float, skip: int) -> str:
+    return f"{score!r}:{skip}"
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[str, int]:
+    """``(max score, members at that score already returned)`` of a cursor"""
+    if not cursor:
+        return "+inf", 0
+    try:
+        score, skip = cursor.rsplit(":", 1)
+        return repr(float(score)), max(0, int(skip))
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+def _build_page(entries: List[Tuple[Any, float]], hashes: List[List[Any]], cursor: Optional[str],
+                limit: int) -> Dict[str, Any]:
+    articles = []
+    for (key, _), values in zip(entries, hashes):
+        article = {field: _decode(value) for field, value in zip(FEED_FIELDS, values) if value is not None}
+        if "url" not in article:
+            continue  # pruned between the range read and the hash reads
+        if "published_ts" in article:
+            article["published_ts"] = float(article["published_ts"])
+        article["sources"] = json.loads(article["sources"]) if article.get("sources") else [article.get("source", "")]
+        article["key"] = _decode(key)
+        articles.append(article)
+
+    next_cursor = None
+    if len(entries) == limit:
+        # Skip past every member already returned at the last score, across pages
+        max_score, skip = decode_cursor(cursor)
+        last = entries[-1][1]
+        tied = sum(1 for _, score in entries if score == last)
+        next_cursor = encode_cursor(last, skip + tied if float(max_score) == last else tied)
+    return {"articles": articles, "next_cursor": next_cursor}
+
+def _clamp(limit: int) -> int:
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+def recent_articles(redis_client, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Newest articles first, one page per call.
+
+    Reads the ``news:recent`` index from the cursor position and fetches
+    the page's article hashes in one pipeline, so a page costs O(limit)
+    whatever the corpus size. Pass the returned ``next_cursor`` back for
+    the following page; it is None after the last one.
+    """
+    limit = _clamp(limit)
+    max_score, skip = decode_cursor(cursor)
+    entries = redis_client.zrevrangebyscore(RECENT_INDEX_KEY, max_score, "-inf",
+                                            start=skip, num=limit, withscores=True)
+    pipe = redis_client.pipeline(transaction=False)
+    for key, _ in entries:
+        pipe.hmget(key, FEED_FIELDS)
+    hashes = pipe.execute() if entries else []
+    return _build_page(entries, hashes, cursor, limit)
+
+async def recent_articles_async(redis_client, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """recent_articles for a ``redis.asyncio`` client"""
+    limit = _clamp(limit)
+    max_score, skip = decode_cursor(cursor)
+    entries = await redis_client.zrevrangebyscore(RECENT_INDEX_KEY, max_score, "-inf",
+                                                  start=skip, num=limit, withscores=True)
+    pipe = redis_client.pipeline(transaction=False)
+    for key, _ in entries:
+        pipe.hmget(key, FEED_FIELDS)
+    hashes = await pipe.execute() if entries else []
+    return _build_page(entries, hashes, cursor, limit)
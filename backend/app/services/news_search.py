@@ -0,0 +1,115 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from backend.app.config import settings
+from backend.app.services.embedding_service import get_query_embedding_async, query_embedding_cache
+from backend.app.services.rag_service import RAGService
+from backend.app.utils.cache import LRUCache
+from backend.app.utils.helpers import hash_text, make_snippet
+from backend.app.utils.logger import logger
+
+def group_by_article(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse ranked chunks into ranked articles.
+
+    An article takes the rank and snippet of its best chunk and counts
+    how many of its chunks matched.
+    """
+    articles: Dict[str, Dict[str, Any]] = {}
+    for chunk in chunks:
+        metadata = chunk["metadata"]
+        url = metadata.get("url")
+        if not url:
+            continue
+        if url in articles:
+            articles[url]["matched_chunks"] += 1
+            continue
+        articles[url] = {
+            "title": metadata.get("title", ""),
+            "url": url,
+            "source": metadata.get("source", ""),
+            "published_date": metadata.get("published_date", ""),
+            "published_ts": metadata.get("published_ts", 0.0),
+            "snippet": make_snippet(chunk.get("document") or ""),
+            "matched_chunks": 1
+        }
+    return list(articles.values())
+
+class NewsSearchService:
+    """Article search with cursor pagination over a cached ranking.
+
+    The first page embeds the query, retrieves SEARCH_CANDIDATES chunks
+    and groups them into ranked articles. That list is cached for
+    SEARCH_CACHE_TTL seconds under an ID derived from the query and its
+    filters. Later pages are slices of the cached list, with no embedding
+    or vector search. The cache is per process, so a page served by
+    another worker, or after expiry, recomputes the ranking once.
+    """
+
+    def __init__(self):
+        self.results = LRUCache(maxsize=settings.SEARCH_CACHE_SIZE, ttl=settings.SEARCH_CACHE_TTL)
+        self._rag_service: Optional[RAGService] = None
+
+    @property
+    def rag_service(self) -> RAGService:
+        if self._rag_service is None:
+            self._rag_service = RAGService()
+        return self._rag_service
+
+    @staticmethod
+    def result_id(query: str, filters: Dict[str, Any]) -> str:
+        normalized = query_embedding_cache.normalize(query)
+        return hash_text(f"{normalized}\x1f{json.dumps(filters, sort_keys=True)}")[:16]
+
+    @staticmethod
+    def decode_cursor(cursor: Optional[str], result_id: str) -> int:
+        if not cursor:
+            return 0
+        try:
+            cursor_id, offset = cursor.rsplit(":", 1)
+            offset = int(offset)
+        except ValueError:
+            raise ValueError(f"Invalid cursor '{cursor}'")
+        if cursor_id != result_id or offset < 0:
+            raise ValueError("Cursor does not belong to this query")
+        return offset
+
+    async def _rank(self, query: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Ranked articles for a query; raises RuntimeError if embedding or
+        retrieval failed, so an outage is never cached as an empty result"""
+        query_embedding = await get_query_embedding_async(query)
+        if query_embedding is None:
+            raise RuntimeError("Failed to embed search query")
+        chunks = await asyncio.to_thread(
+            self.rag_service.retrieve_chunks, query, settings.SEARCH_CANDIDATES, query_embedding, **filters
+        )
+        if chunks is None:
+            raise RuntimeError("Search retrieval failed")
+        return group_by_article(chunks)
+
+    async def search(self, query: str, limit: int = 10, cursor: Optional[str] = None,
+                     filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """One page of articles for a query, with ``next_cursor`` for the next
+        page or None after the last one"""
+        filters = {key: value for key, value in (filters or {}).items() if value is not None}
+        limit = max(1, min(int(limit), settings.SEARCH_MAX_PAGE_SIZE))
+        result_id = self.result_id(query, filters)
+        offset = self.decode_cursor(cursor, result_id)
+
+        articles = self.results.get(result_id)
+        if articles is None:
+            articles = await self._rank(query, filters)
+            self.results.set(result_id, articles)
+            logger.debug(f"Ranked {len(articles)} articles for search {result_id}")
+
+        end = offset + limit
+        return {
+            "articles": articles[offset:end],
+            "total": len(articles),
+            "next_cursor": f"{result_id}:{end}" if end < len(articles) else None
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return self.results.stats()
+
+news_search_service = NewsSearchService()
@@ -1,48 +1,117 @@
+import asyncio
+import calendar
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
 import feedparser
-import requests
 from bs4 import BeautifulSoup
+from backend.app.config import settings
+from backend.app.services.article_extractor import ArticleExtractor
+from backend.app.utils.helpers import chunk_text, parse_published
 from backend.app.utils.logger import logger
 
+class FeedStateStore:
+    """Persists ETag/Last-Modified validators per feed URL in a JSON file.
+
+    Validators from a fetch stay pending until ``commit`` is called for
+    their feed, which callers do once that feed's articles are stored.
+    Until then the previous validators keep being sent, so a run that
+    failed part way fetches the same entries again.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(settings.DATA_DIR, settings.FEED_STATE_FILE)
+        self.state: Dict[str, Dict[str, str]] = {}
+        self.pending: Dict[str, Optional[Dict[str, str]]] = {}
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.state = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load feed state from {self.path}, starting fresh: {e}")
+            self.state = {}
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        headers = {}
+        validators = self.state.get(url, {})
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def update(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        if etag or last_modified:
+            self.pending[url] = {"etag": etag or "", "last_modified": last_modified or ""}
+        else:
+            self.pending[url] = None
+
+    def commit(self, urls: Optional[Iterable[str]] = None):
+        """Make the pending validators of ``urls`` (all feeds by default) current and save"""
+        urls = list(self.pending) if urls is None else [url for url in urls if url in self.pending]
+        if not urls:
+            return
+        for url in urls:
+            validators = self.pending.pop(url)
+            if validators:
+                self.state[url] = validators
+            else:
+                self.state.pop(url, None)
+        self.save()
+
+    def save(self):
+        """Write the state atomically so a crash never leaves a torn file"""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save feed state to {self.path}: {e}")
+
 class NewsService:
-    def __init__(self):
-        self.sources = [
-            "https://www.aljazeera.com/xml/rss/all.xml",
-            "http://rss.cnn.com/rss/edition.rss",  # Fallback RSS feed
-        ]
+    def __init__(self, sources: Optional[List[str]] = None, full_text: Optional[bool] = None):
+        self.sources = list(sources or settings.NEWS_SOURCES)
+        self.feed_state = FeedStateStore()
+        self.full_text = settings.ARTICLE_FULL_TEXT if full_text is None else full_text
+        self.extractor = ArticleExtractor() if self.full_text else None
+        self.listings: Dict[str, List[str]] = {}  # every article URL per feed, from its last full fetch
+        self._session: Optional[aiohttp.ClientSession] = None
 
-    def fetch_articles(self, limit=50):
-        articles = []
-        for source in self.sources:
-            logger.info(f"Fetching articles from source: {source}")
+    def fetch_articles(self, limit=50, conditional=False):
+        """Blocking wrapper around fetch_articles_async for scripts"""
+        async def run():
             try:
-                # Add a timeout to prevent hanging
-                response = requests.get(source, timeout=10)
-                if response.status_code != 200:
-                    logger.error(f"Failed to fetch RSS feed from {source}: Status code {response.status_code}")
-                    continue
-
-                feed = feedparser.parse(response.content)
-                if not feed.entries:
-                    logger.warning(f"No entries found for source: {source}")
-                    continue
-
-                for entry in feed.entries[:limit]:
-                    article = {
-                        "title": entry.get("title", ""),
-                        "url": entry.get("link", ""),
-                        "published_date": entry.get("published", ""),
-                        "source": source,
-                        "content": self._extract_content(entry)
-                    }
-                    article["chunks"] = self._chunk_content(article["content"])
-                    if article["title"] and article["url"] and article["chunks"]:
-                        articles.append(article)
-                        logger.info(f"Successfully fetched article from {source}: {article['url']}")
-                    else:
-                        logger.warning(f"Skipping article due to missing fields: {article}")
-            except Exception as e:
-                logger.error(f"Failed to fetch articles from {source}: {e}")
-                continue
+                return await self.fetch_articles_async(limit=limit, conditional=conditional)
+            finally:
+                await self.close()
+        return asyncio.run(run())
+
+    async def fetch_articles_async(self, limit=50, conditional=True) -> List[Dict]:
+        """Fetch every source concurrently over the shared connection pool.
+
+        With ``conditional`` set, stored ETag/Last-Modified validators are sent
+        and feeds answering 304 Not Modified contribute no articles. Every
+        feed fetched in full lists all its article URLs in ``listings``,
+        whatever the limit; feeds that failed or were unchanged are absent
+        from it. The new
+        validators are only kept once ``commit_feed_state`` is called. With
+        full-text extraction on, each article's page is fetched and its body
+        replaces the feed summary before chunking.
+        """
+        session = await self._get_session()
+        self.listings = {}
+        results = await asyncio.gather(
+            *(self._fetch_source(session, source, limit, conditional) for source in self.sources)
+        )
+
+        articles = [article for source_articles in results for article in source_articles][:limit]
+        if self.extractor is not None and articles:
+            await self.extractor.extract(session, articles)
+        for article in articles:
+            self.chunk_article(article)
 
         # If no articles are fetched, log a warning and return an empty list
         if not articles:
@@ -50,7 +119,104 @@ class NewsService:
         else:
             logger.info(f"Total articles fetched: {len(articles)}")
 
-        return articles[:limit]
+        return articles
+
+    async def fetch_feed(self, source: str, limit: Optional[int] = None, conditional: bool = True) -> List[Dict]:
+        """Fetch one feed's articles without extracting or chunking them"""
+        session = await self._get_session()
+        return await self._fetch_source(session, source, limit or settings.MAX_ARTICLES_PER_SOURCE, conditional)
+
+    def commit_feed_state(self, sources: Optional[Iterable[str]] = None):
+        """Persist the validators fetched for ``sources`` (all by default).
+
+        Call this once those feeds' articles are stored; feeds left out are
+        fetched in full again next time.
+        """
+        self.feed_state.commit(sources)
+
+    async def extract_full_text(self, articles: List[Dict]) -> List[Dict]:
+        if self.extractor is not None and articles:
+            await self.extractor.extract(await self._get_session(), articles)
+        return articles
+
+    def chunk_article(self, article: Dict) -> Dict:
+        article["chunks"] = self._chunk_content(article["content"])
+        return article
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.extractor is not None:
+            self.extractor.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.FEED_MAX_CONNECTIONS,
+                limit_per_host=settings.FEED_PER_HOST_LIMIT,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.REQUEST_TIMEOUT)
+            )
+        return self._session
+
+    async def _fetch_source(self, session: aiohttp.ClientSession, source: str, limit: int, conditional: bool) -> List[Dict]:
+        logger.info(f"Fetching articles from source: {source}")
+        headers = self.feed_state.conditional_headers(source) if conditional else {}
+        try:
+            async with session.get(source, headers=headers) as response:
+                if response.status == 304:
+                    logger.info(f"Feed not modified since last fetch, skipping: {source}")
+                    return []
+                if response.status != 200:
+                    logger.error(f"Failed to fetch RSS feed from {source}: Status code {response.status}")
+                    return []
+                content = await response.read()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+
+            feed = await asyncio.to_thread(feedparser.parse, content)
+            if not feed.entries:
+                logger.warning(f"No entries found for source: {source}")
+                return []
+
+            articles = self._parse_entries(feed.entries, source)
+            self.listings[source] = [article["url"] for article in articles]
+            self.feed_state.update(source, etag, last_modified)
+            return articles[:limit]
+        except Exception as e:
+            logger.error(f"Failed to fetch articles from {source}: {e}")
+            return []
+
+    def _parse_entries(self, entries, source: str) -> List[Dict]:
+        articles = []
+        for entry in entries:
+            article = {
+                "title": entry.get("title", ""),
+                "url": entry.get("link", ""),
+                "published_date": entry.get("published", ""),
+                "published_ts": self._published_ts(entry),
+                "source": source,
+                "content": self._extract_content(entry)
+            }
+            if article["title"] and article["url"] and article["content"].strip():
+                articles.append(article)
+                logger.info(f"Successfully fetched article from {source}: {article['url']}")
+            else:
+                logger.warning(f"Skipping article due to missing fields: {article}")
+        return articles
+
+    @staticmethod
+    def _published_ts(entry) -> Optional[float]:
+        """Publication time as epoch seconds, preferring feedparser's UTC parse"""
+        for field in ("published_parsed", "updated_parsed"):
+            parsed = entry.get(field)
+            if parsed:
+                return float(calendar.timegm(parsed))
+        return parse_published(entry.get("published", "") or entry.get("updated", ""))
 
     def _extract_content(self, entry):
         # Extract content from the feed entry
@@ -64,7 +230,7 @@ class NewsService:
         return content
 
     def _chunk_content(self, content):
-        # Simple chunking logic: split content into chunks of 500 characters
+        # Sentence-aligned chunks sized to the embedding model's token budget
         if not content:
             return []
-        return [content[i:i+500] for i in range(0, len(content), 500)]
\ No newline at end of file
+        return chunk_text(content, max_tokens=settings.CHUNK_SIZE, overlap_tokens=settings.CHUNK_OVERLAP)
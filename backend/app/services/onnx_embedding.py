@@ -0,0 +1,163 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Union
+
+import numpy as np
+from backend.app.config import settings
+from backend.app.utils.logger import logger
+
+def hub_model_id(name: str) -> str:
+    """SentenceTransformer short names live under the sentence-transformers org"""
+    return name if "/" in name else f"sentence-transformers/{name}"
+
+def onnx_model_paths(model_name: str, directory: Optional[str] = None):
+    directory = directory or os.path.join(settings.DATA_DIR, settings.EMBEDDING_ONNX_DIR)
+    base = os.path.join(directory, model_name.replace("/", "__"))
+    return f"{base}.onnx", f"{base}.int8.onnx"
+
+def export_onnx_model(model_name: str, path: str, opset: int = 14):
+    """Export the transformer under a SentenceTransformer model to ONNX.
+
+    Needs torch and transformers, but only once; serving the exported file
+    needs neither.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    start = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(hub_model_id(model_name))
+    model = AutoModel.from_pretrained(hub_model_id(model_name)).eval()
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    axes = {0: "batch", 1: "sequence"}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            model, tuple(sample[n] for n in names), path,
+            input_names=names, output_names=["last_hidden_state"],
+            dynamic_axes={n: axes for n in names + ["last_hidden_state"]},
+            opset_version=opset
+        )
+    logger.info(f"Exported {model_name} to {path} in {time.perf_counter() - start:.1f}s")
+
+def quantize_onnx_model(source: str, target: str):
+    """Dynamic int8 quantization of the weights; activations stay float"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    logger.info(f"Quantized {source} -> {target} "
+                f"({os.path.getsize(source) / 2**20:.0f} MiB -> {os.path.getsize(target) / 2**20:.0f} MiB)")
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock across processes, released by the OS if the holder dies"""
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s; keep waiting
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def _write_atomically(path: str, write: Callable[[str], None]):
+    """Have ``write`` produce a temporary file, then rename it to ``path``"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def prepare_onnx_model(model_name: str, quantize: bool) -> str:
+    """Path of the ONNX graph to serve, exporting and quantizing it first if missing.
+
+    Exports run under a lock file and are renamed into place when
+    complete, so embedding workers starting together export once and an
+    interrupted export never leaves a partial model behind.
+    """
+    fp32_path, int8_path = onnx_model_paths(model_name)
+    path = int8_path if quantize else fp32_path
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(fp32_path), exist_ok=True)
+    with _file_lock(f"{fp32_path}.lock"):
+        if not os.path.exists(fp32_path):
+            logger.warning(f"No ONNX export of {model_name} at {fp32_path}, exporting now")
+            _write_atomically(fp32_path, lambda tmp_path: export_onnx_model(model_name, tmp_path))
+        if quantize and not os.path.exists(int8_path):
+            _write_atomically(int8_path, lambda tmp_path: quantize_onnx_model(fp32_path, tmp_path))
+    return path
+
+class OnnxEmbeddingModel:
+    """SentenceTransformer-compatible ``encode`` on ONNX Runtime.
+
+    Reproduces the all-MiniLM-L6-v2 pipeline: WordPiece tokenization
+    truncated to ``max_seq_length``, the transformer, attention-masked mean
+    pooling and L2 normalization. Batches are sorted by length so padding
+    stays short. The exported graph is created on first use if missing.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, quantize: Optional[bool] = None,
+                 threads: Optional[int] = None, max_seq_length: int = 256):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name or settings.EMBEDDING_MODEL
+        quantize = settings.EMBEDDING_ONNX_QUANTIZE if quantize is None else quantize
+        threads = settings.EMBEDDING_THREADS if threads is None else threads
+        self.max_seq_length = max_seq_length
+
+        self.path = prepare_onnx_model(self.model_name, quantize)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(self.path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(hub_model_id(self.model_name))
+        logger.info(f"ONNX Runtime embedding model ready: {self.path} ({threads or 'default'} threads)")
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        tokens = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_seq_length,
+                                return_tensors="np")
+        feeds = {name: tokens[name].astype(np.int64) for name in self.input_names if name in tokens}
+        if "token_type_ids" in self.input_names and "token_type_ids" not in feeds:
+            feeds["token_type_ids"] = np.zeros_like(feeds["input_ids"])
+        hidden = self.session.run(None, feeds)[0]
+        mask = tokens["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, convert_to_numpy: bool = True,
+               show_progress_bar: bool = False) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        ordered = np.vstack([
+            self._encode_batch([texts[i] for i in order[start:start + batch_size]])
+            for start in range(0, len(texts), batch_size)
+        ]).astype(np.float32)
+        embeddings = np.empty_like(ordered)
+        embeddings[order] = ordered
+        return embeddings[0] if single else embeddings
@@ -1,48 +1,264 @@
-from typing import List, Optional
-from backend.app.database.chroma_client import chroma_client
-from backend.app.services.embedding_service import get_embeddings
+import asyncio
+import math
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from backend.app.database.vector_store import build_where, get_vector_store, matches_where
+from backend.app.database.lexical_index import lexical_index
+from backend.app.services.context_builder import build_context
+from backend.app.services.embedding_service import get_query_embedding, get_query_embedding_async
+from backend.app.services.gemini_service import generate_response, stream_response, FALLBACK_RESPONSES
+from backend.app.services.rerank_service import rerank_service
+from backend.app.services.response_cache import response_cache, chunk_fingerprint
 from backend.app.utils.logger import logger
 from backend.app.config import settings
 
+NO_CONTEXT_RESPONSE = "I couldn't find any relevant news articles to answer your question."
+CHUNK_FIELDS = ["documents", "metadatas", "embeddings"]  # Embeddings are reused by the context builder
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Combine ranked ID lists, scoring each ID by sum(1 / (k + rank))"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
 class RAGService:
     def __init__(self):
         try:
-            self.collection = chroma_client.get_collection(name=settings.COLLECTION_NAME)
-            logger.info("RAGService initialized with ChromaDB collection")
+            self.collection = get_vector_store()
+            logger.info(f"RAGService initialized with {self.collection.name} vector store")
         except Exception as e:
             logger.error(f"Failed to initialize RAGService: {e}")
             raise
 
-    def retrieve_context(self, query: str, top_k: int = 3) -> Optional[List[str]]:
-        """Retrieve relevant context for a query using ChromaDB"""
+    def retrieve_chunks(self, query: str, top_k: int = 3, query_embedding=None,
+                        since: Optional[float] = None, until: Optional[float] = None,
+                        sources: Optional[Sequence[str]] = None,
+                        recency_half_life_hours: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """Retrieve the best chunks with their IDs, metadata and distances.
+
+        With HYBRID_SEARCH enabled, dense candidates from the vector store and BM25
+        candidates from the lexical index are fused with reciprocal rank
+        fusion, so exact names and tickers the embedding misses still
+        surface. With RERANK_ENABLED, RERANK_CANDIDATES are over-fetched and
+        the cross-encoder keeps the best ``top_k``.
+
+        ``since``/``until`` (epoch seconds) and ``sources`` (feed URLs)
+        restrict the search inside the vector store. With a recency half-life
+        (RECENCY_HALF_LIFE_HOURS by default), the final (re-ranked) scores
+        are decayed by age so newer stories win close calls.
+
+        Returns an empty list when nothing matches and None when embedding
+        or the search itself failed.
+        """
         try:
             if not query.strip():
                 logger.warning("Empty query provided for context retrieval")
-                return None
+                return []
 
             # Generate embedding for the query
-            logger.debug(f"Generating embedding for query: {query}")
-            query_embedding = get_embeddings(query)
+            if query_embedding is None:
+                logger.debug(f"Generating embedding for query: {query}")
+                query_embedding = get_query_embedding(query)
             if query_embedding is None:
                 logger.error("Failed to generate embedding for query")
                 return None
 
-            # Query ChromaDB for similar documents
-            logger.debug(f"Querying ChromaDB with top_k={top_k}")
+            if recency_half_life_hours is None:
+                recency_half_life_hours = settings.RECENCY_HALF_LIFE_HOURS
+            where = build_where(since, until, sources)
+
+            # Query the vector store for similar documents
+            over_fetch = settings.RERANK_ENABLED or recency_half_life_hours > 0
+            pool_size = max(top_k, settings.RERANK_CANDIDATES) if over_fetch else top_k
+            n_results = max(pool_size, settings.HYBRID_CANDIDATES) if settings.HYBRID_SEARCH else pool_size
+            logger.debug(f"Querying vector store with n_results={n_results}, where={where}")
             results = self.collection.query(
                 query_embeddings=[query_embedding.tolist()],
-                n_results=top_k
+                n_results=n_results,
+                where=where,
+                include=CHUNK_FIELDS + ["distances"]
             )
+            chunks = self._to_chunks(results)
+
+            if settings.HYBRID_SEARCH:
+                lexical = lexical_index.search(query, settings.HYBRID_CANDIDATES)
+                logger.debug(f"Lexical index returned {len(lexical)} candidates")
+                chunks = self._fuse(chunks, lexical, pool_size, where)
 
             # Extract documents from results
-            if not results or not results.get("documents"):
-                logger.warning("No documents found in ChromaDB for the query")
-                return None
+            if not chunks:
+                logger.warning("No documents found in the vector store for the query")
+                return []
 
-            documents = results["documents"][0]
-            logger.debug(f"Retrieved {len(documents)} documents from ChromaDB")
-            return documents
+            if settings.RERANK_ENABLED:
+                # Keep the whole pool when recency re-orders it afterwards
+                keep = pool_size if recency_half_life_hours > 0 else top_k
+                chunks = rerank_service.rerank(query, chunks[:pool_size], keep)
+            if recency_half_life_hours > 0:
+                chunks = self._boost_recent(chunks, recency_half_life_hours)
+            chunks = chunks[:top_k]
+            logger.debug(f"Retrieved {len(chunks)} documents from the vector store")
+            return chunks
 
         except Exception as e:
             logger.error(f"Error retrieving context from ChromaDB: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def _to_chunks(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Flatten a single-query vector store result into chunk dicts"""
+        if not results or not results.get("ids") or not results["ids"][0]:
+            return []
+        ids = results["ids"][0]
+        documents = (results.get("documents") or [[None] * len(ids)])[0]
+        metadatas = (results.get("metadatas") or [[{}] * len(ids)])[0]
+        distances = (results.get("distances") or [[None] * len(ids)])[0]
+        # Chroma may hand embeddings back as numpy arrays, which have no truth value
+        embeddings = results.get("embeddings")
+        embeddings = embeddings[0] if embeddings is not None and len(embeddings) else [None] * len(ids)
+        return [
+            {"id": chunk_id, "document": document, "metadata": metadata or {}, "distance": distance,
+             "embedding": embedding}
+            for chunk_id, document, metadata, distance, embedding in zip(ids, documents, metadatas, distances, embeddings)
+        ]
+
+    def _fuse(self, dense: List[Dict[str, Any]], lexical: List[tuple], top_k: int,
+              where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Merge dense and lexical rankings, fetching lexical-only chunks by ID.
+
+        The lexical index holds no metadata, so lexical-only chunks are
+        checked against ``where`` once fetched.
+        """
+        if not lexical:
+            return dense
+        fused = reciprocal_rank_fusion(
+            [[chunk["id"] for chunk in dense], [chunk_id for chunk_id, _ in lexical]],
+            k=settings.RRF_K
+        )
+
+        by_id = {chunk["id"]: chunk for chunk in dense}
+        # Without a filter no lexical-only chunk is dropped, so fetching the top_k is enough
+        candidates = fused if where else fused[:top_k]
+        missing = [chunk_id for chunk_id, _ in candidates if chunk_id not in by_id]
+        if missing:
+            fetched = self.collection.get(ids=missing, include=CHUNK_FIELDS)
+            embeddings = fetched.get("embeddings")
+            if embeddings is None or not len(embeddings):
+                embeddings = [None] * len(fetched["ids"])
+            for chunk_id, document, metadata, embedding in zip(fetched["ids"], fetched["documents"],
+                                                               fetched["metadatas"], embeddings):
+                if matches_where(metadata or {}, where):
+                    by_id[chunk_id] = {"id": chunk_id, "document": document, "metadata": metadata or {},
+                                       "distance": None, "embedding": embedding}
+
+        chunks = []
+        for chunk_id, score in candidates:
+            # IDs can linger in the lexical index briefly after a vector delete
+            if chunk_id in by_id:
+                chunks.append(dict(by_id[chunk_id], score=score))
+        return chunks[:top_k]
+
+    @staticmethod
+    def _boost_recent(chunks: List[Dict[str, Any]], half_life_hours: float) -> List[Dict[str, Any]]:
+        """Re-order candidates by relevance scaled with an exponential age decay.
+
+        Relevance is the cross-encoder score squashed into (0, 1) when
+        present, otherwise the fused score, otherwise the cosine similarity.
+        RECENCY_WEIGHT of it halves every ``half_life_hours``; undated chunks
+        get no recency credit. Re-ranked chunks stay ahead of any the
+        re-ranking budget left unscored.
+        """
+        now = time.time()
+        weight = settings.RECENCY_WEIGHT
+        boosted = []
+        for chunk in chunks:
+            if chunk.get("rerank_score") is not None:
+                relevance = 1.0 / (1.0 + math.exp(-chunk["rerank_score"]))
+            elif chunk.get("score") is not None:
+                relevance = chunk["score"]
+            elif chunk.get("distance") is not None:
+                relevance = 1.0 - chunk["distance"] / 2.0
+            else:
+                relevance = 0.0
+            published_ts = chunk["metadata"].get("published_ts") or 0
+            decay = 0.5 ** (max(0.0, now - published_ts) / 3600 / half_life_hours) if published_ts else 0.0
+            boosted.append(dict(chunk, score=relevance * (1.0 - weight + weight * decay), recency=decay))
+        return sorted(boosted, key=lambda chunk: (chunk.get("rerank_score") is not None, chunk["score"]),
+                      reverse=True)
+
+    def retrieve_context(self, query: str, top_k: int = 3) -> Optional[List[str]]:
+        """Retrieve relevant context for a query using ChromaDB"""
+        chunks = self.retrieve_chunks(query, top_k=top_k)
+        if not chunks:
+            return None
+        return [chunk["document"] for chunk in chunks]
+
+    async def _prepare_answer(self, query: str, top_k: int, filters: Optional[Dict[str, Any]] = None):
+        """Retrieve context and look up the answer cache.
+
+        The query embedding is coalesced with concurrent requests and the
+        blocking retrieval runs in a worker thread, keeping the event loop
+        free. Returns ``(answer, None)`` when no generation is needed,
+        otherwise ``(None, (query_embedding, fingerprint, context))``.
+        """
+        query_embedding = await get_query_embedding_async(query)
+        if query_embedding is None:
+            return NO_CONTEXT_RESPONSE, None
+        chunks = await asyncio.to_thread(self.retrieve_chunks, query, top_k, query_embedding, **(filters or {}))
+        if not chunks:
+            return NO_CONTEXT_RESPONSE, None
+
+        fingerprint = chunk_fingerprint(chunks)
+        if settings.ANSWER_CACHE_ENABLED:
+            cached = response_cache.get(query_embedding, fingerprint)
+            if cached is not None:
+                return cached, None
+
+        context = build_context(query, chunks, query_embedding)
+        return None, (query_embedding, fingerprint, context)
+
+    def _remember_answer(self, generation, response: str):
+        query_embedding, fingerprint, _ = generation
+        if settings.ANSWER_CACHE_ENABLED and response not in FALLBACK_RESPONSES:
+            response_cache.set(query_embedding, fingerprint, response)
+
+    async def generate_response(self, query: str, session_id: Optional[str] = None,
+                                chat_history: Optional[List[Any]] = None, top_k: int = 3,
+                                filters: Optional[Dict[str, Any]] = None) -> str:
+        """Answer a question from retrieved news context.
+
+        Answers are served from the semantic response cache when a similar
+        question was answered against the same chunks. ``filters`` holds
+        retrieve_chunks keyword arguments (``since``, ``until``, ``sources``,
+        ``recency_half_life_hours``).
+        """
+        answer, generation = await self._prepare_answer(query, top_k, filters)
+        if generation is None:
+            logger.debug(f"Answered without generation for session {session_id}")
+            return answer
+
+        response = await generate_response(query, generation[2])
+        self._remember_answer(generation, response)
+        return response
+
+    async def stream_response(self, query: str, session_id: Optional[str] = None,
+                              chat_history: Optional[List[Any]] = None, top_k: int = 3,
+                              filters: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Like generate_response, but yields the answer as it is generated.
+
+        A generation that fails part way raises after the partial text, and
+        that text is not cached.
+        """
+        answer, generation = await self._prepare_answer(query, top_k, filters)
+        if generation is None:
+            logger.debug(f"Answered without generation for session {session_id}")
+            yield answer
+            return
+
+        parts = []
+        async for token in stream_response(query, generation[2]):
+            parts.append(token)
+            yield token
+        self._remember_answer(generation, "".join(parts).strip())
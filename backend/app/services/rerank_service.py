@@ -0,0 +1,75 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from backend.app.config import settings
+from backend.app.utils.logger import logger
+
+class RerankService:
+    """Re-scores retrieved chunks with a small CPU cross-encoder.
+
+    Candidates are scored in batches in their retrieval order until the
+    per-query time budget would be exceeded. The scored prefix is sorted
+    by cross-encoder score, and any unscored tail keeps its retrieval
+    order, so a blown budget degrades to plain vector ranking.
+    """
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or settings.RERANK_MODEL
+        self.model = None
+        self._lock = threading.Lock()
+        self.budget_exhausted = 0
+
+    def _get_model(self):
+        if self.model is None:
+            with self._lock:
+                if self.model is None:
+                    from sentence_transformers import CrossEncoder
+                    self.model = CrossEncoder(self.model_name, device="cpu")
+                    logger.info(f"Loaded re-ranking model: {self.model_name}")
+        return self.model
+
+    def rerank(self, query: str, chunks: List[Dict[str, Any]], top_k: int,
+               budget_ms: Optional[float] = None) -> List[Dict[str, Any]]:
+        if len(chunks) <= 1:
+            return chunks[:top_k]
+        budget = (settings.RERANK_BUDGET_MS if budget_ms is None else budget_ms) / 1000
+        batch_size = settings.RERANK_BATCH_SIZE
+
+        try:
+            model = self._get_model()
+            # The budget covers scoring only, not the one-off lazy model load
+            start = time.perf_counter()
+            deadline = start + budget
+            scores: List[float] = []
+            last_batch_time = 0.0
+            for offset in range(0, len(chunks), batch_size):
+                # Skip a batch that would likely overrun the remaining budget
+                if time.perf_counter() + last_batch_time > deadline:
+                    self.budget_exhausted += 1
+                    break
+                batch_start = time.perf_counter()
+                pairs = [(query, chunk["document"]) for chunk in chunks[offset:offset + batch_size]]
+                scores.extend(float(s) for s in model.predict(pairs, batch_size=batch_size, show_progress_bar=False))
+                last_batch_time = time.perf_counter() - batch_start
+        except Exception as e:
+            logger.error(f"Re-ranking failed, keeping retrieval order: {e}")
+            return chunks[:top_k]
+
+        if not scores:
+            logger.warning("Re-ranking budget exhausted before any candidate was scored")
+            return chunks[:top_k]
+
+        scored = sorted(
+            (dict(chunk, rerank_score=score) for chunk, score in zip(chunks, scores)),
+            key=lambda chunk: chunk["rerank_score"],
+            reverse=True
+        )
+        logger.debug(f"Re-ranked {len(scores)}/{len(chunks)} candidates in "
+                     f"{(time.perf_counter() - start) * 1000:.1f}ms")
+        return (scored + chunks[len(scores):])[:top_k]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": settings.RERANK_ENABLED, "model": self.model_name,
+                "budget_exhausted": self.budget_exhausted}
+
+rerank_service = RerankService()
@@ -0,0 +1,75 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from backend.app.config import settings
+from backend.app.utils.cache import LRUCache
+from backend.app.utils.logger import logger
+
+def chunk_fingerprint(chunks: Iterable[Dict[str, Any]]) -> frozenset:
+    """Identify a retrieved context by its chunk IDs and content hashes.
+
+    Ingestion stores a ``chunk_hash`` in each chunk's metadata, so any
+    re-ingested chunk yields a different fingerprint and answers generated
+    from its old text can no longer be served.
+    """
+    return frozenset(
+        f"{chunk['id']}:{(chunk.get('metadata') or {}).get('chunk_hash', '')}" for chunk in chunks
+    )
+
+class SemanticResponseCache:
+    """Caches generated answers keyed on the retrieved chunk set.
+
+    Within a chunk set, a cached answer is reused when the cosine similarity
+    between its query embedding and the new query embedding reaches
+    ``threshold``.
+    """
+
+    def __init__(self, threshold: float = None, maxsize: int = None, ttl: int = None, per_context: int = 8):
+        self.threshold = settings.ANSWER_CACHE_THRESHOLD if threshold is None else threshold
+        self.per_context = per_context
+        self.buckets = LRUCache(
+            maxsize=settings.ANSWER_CACHE_SIZE if maxsize is None else maxsize,
+            ttl=settings.ANSWER_CACHE_TTL if ttl is None else ttl
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _unit(embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, query_embedding: np.ndarray, fingerprint: frozenset) -> Optional[str]:
+        with self._lock:
+            bucket: Optional[List[tuple]] = self.buckets.get(fingerprint)
+            if bucket:
+                vectors = np.stack([vector for vector, _ in bucket])
+                similarities = vectors @ self._unit(query_embedding)
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self.hits += 1
+                    logger.debug(f"Answer cache hit (similarity {similarities[best]:.3f})")
+                    return bucket[best][1]
+            self.misses += 1
+            return None
+
+    def set(self, query_embedding: np.ndarray, fingerprint: frozenset, answer: str):
+        with self._lock:
+            bucket = self.buckets.get(fingerprint) or []
+            bucket.append((self._unit(query_embedding), answer))
+            self.buckets.set(fingerprint, bucket[-self.per_context:])
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "contexts": len(self.buckets),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+response_cache = SemanticResponseCache()
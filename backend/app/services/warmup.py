@@ -0,0 +1,57 @@
+import time
+from typing import Any, Dict
+from backend.app.config import settings
+from backend.app.utils.logger import logger
+
+# Filled in by main.py and warm_up(); served under /stats
+startup_stats: Dict[str, Any] = {}
+
+def preload_models():
+    """Load model weights without running them.
+
+    Meant for a server master that forks its workers afterwards (gunicorn
+    --preload): the weights are then shared copy-on-write by every worker.
+    No forward pass runs here because torch's thread pools do not survive
+    a fork; each worker runs that in its own warm_up().
+    """
+    from backend.app.services.embedding_service import embedding_service
+
+    start = time.perf_counter()
+    embedding_service.warm_up(encode=False)
+    startup_stats["preload_seconds"] = round(time.perf_counter() - start, 3)
+    logger.info(f"Preloaded models in {startup_stats['preload_seconds']}s")
+
+def warm_up() -> Dict[str, float]:
+    """Initialize every lazy singleton a request would touch, timing each step.
+
+    A failing step is logged and skipped, so a missing optional component
+    never blocks startup; the request that needs it will raise instead.
+    """
+    from backend.app.database.lexical_index import lexical_index
+    from backend.app.database.vector_store import get_vector_store
+    from backend.app.services.embedding_service import embedding_service
+    from backend.app.services.gemini_service import get_backend
+    from backend.app.services.rerank_service import rerank_service
+
+    steps = [
+        ("embedding_model", lambda: embedding_service.warm_up(encode=True)),
+        ("vector_store", lambda: get_vector_store().count()),
+        ("lexical_index", lexical_index.count),
+        ("generation_backend", get_backend),
+    ]
+    if settings.RERANK_ENABLED:
+        steps.append(("rerank_model", rerank_service._get_model))
+
+    timings: Dict[str, float] = {}
+    total = time.perf_counter()
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+            timings[name] = round(time.perf_counter() - start, 3)
+        except Exception as e:
+            logger.error(f"Warm-up step {name} failed: {e}")
+    timings["total"] = round(time.perf_counter() - total, 3)
+    startup_stats["warm_up_seconds"] = timings
+    logger.info(f"Warm-up finished: {timings}")
+    return timings
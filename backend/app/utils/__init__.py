@@ -1,5 +1,6 @@
 # Utilities package initialization
-from .helpers import chunk_text, clean_text
+from .helpers import chunk_text, clean_text, estimate_tokens, hash_text, parse_published
 from .logger import logger
+from .metrics import Histogram
 
-__all__ = ["chunk_text", "clean_text", "logger"]
\ No newline at end of file
+__all__ = ["chunk_text", "clean_text", "estimate_tokens", "hash_text", "parse_published", "logger", "Histogram"]
\ No newline at end of file
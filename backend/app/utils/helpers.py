@@ -1,27 +1,103 @@
 import re
-from typing import List
+import hashlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, List, Optional, Tuple
 
-def chunk_text(text: str, max_length: int = 512) -> List[str]:
-    """Split text into chunks of maximum length"""
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    chunks = []
-    current_chunk = ""
-    
-    for sentence in sentences:
-        if len(current_chunk) + len(sentence) + 1 <= max_length:
-            current_chunk += (sentence + " ")
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-leaning estimate of WordPiece tokens: one per word or
+    punctuation mark, plus one per extra 6 characters of a long word"""
+    return sum(1 + (len(token) - 1) // 6 for token in TOKEN_PATTERN.findall(text))
+
+def split_sentences(text: str) -> List[str]:
+    text = re.sub(r'\s+', ' ', text).strip()
+    return [s for s in SENTENCE_BOUNDARY.split(text) if s] if text else []
+
+def _split_long_sentence(sentence: str, max_tokens: int,
+                         count_tokens: Callable[[str], int]) -> List[Tuple[str, int]]:
+    """Break a sentence over the budget into word runs that fit it"""
+    pieces, words, total = [], [], 0
+    for word in sentence.split(" "):
+        tokens = count_tokens(word)
+        if words and total + tokens > max_tokens:
+            pieces.append((" ".join(words), total))
+            words, total = [], 0
+        words.append(word)
+        total += tokens
+    if words:
+        pieces.append((" ".join(words), total))
+    return pieces
+
+def chunk_text(text: str, max_tokens: int = 200, overlap_tokens: int = 40,
+               count_tokens: Optional[Callable[[str], int]] = None) -> List[str]:
+    """Pack whole sentences into chunks of at most ``max_tokens`` tokens.
+
+    Each chunk after the first repeats trailing sentences of the previous
+    one, up to ``overlap_tokens``. Sentences longer than the budget are cut
+    at word boundaries. Every sentence is counted once and each chunk is
+    joined once, so the cost is linear in the length of the text.
+    """
+    count_tokens = count_tokens or estimate_tokens
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+    units: List[Tuple[str, int]] = []
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if tokens <= max_tokens:
+            units.append((sentence, tokens))
         else:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            current_chunk = sentence + " "
-    
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-    
+            units.extend(_split_long_sentence(sentence, max_tokens, count_tokens))
+
+    chunks = []
+    start = 0
+    while start < len(units):
+        end, total = start, 0
+        while end < len(units) and (end == start or total + units[end][1] <= max_tokens):
+            total += units[end][1]
+            end += 1
+        chunks.append(" ".join(unit[0] for unit in units[start:end]))
+        if end == len(units):
+            break
+        # Step back over trailing sentences for overlap, always moving forward
+        next_start, overlap = end, 0
+        while next_start - 1 > start and overlap + units[next_start - 1][1] <= overlap_tokens:
+            next_start -= 1
+            overlap += units[next_start][1]
+        start = next_start
     return chunks
 
 def clean_text(text: str) -> str:
     """Clean text by removing extra whitespace and special characters"""
     text = re.sub(r'\s+', ' ', text)  # Replace multiple whitespace with single space
     text = re.sub(r'[^\w\s.,!?]', '', text)  # Remove special chars except basic punctuation
-    return text.strip()
\ No newline at end of file
+    return text.strip()
+
+def make_snippet(text: str, max_chars: int = 200) -> str:
+    """Whitespace-collapsed preview, cut at a word boundary with an ellipsis"""
+    text = " ".join(text.split())
+    return text if len(text) <= max_chars else text[:max_chars].rsplit(" ", 1)[0] + "..."
+
+def parse_published(value: str) -> Optional[float]:
+    """Epoch seconds of an RSS (RFC 822) or ISO 8601 date string, or None.
+
+    Dates without a timezone are taken as UTC.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def hash_text(text: str) -> str:
+    """Stable content hash used to detect changed articles and chunks"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
\ No newline at end of file
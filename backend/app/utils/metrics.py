@@ -0,0 +1,24 @@
+from bisect import bisect_left
+from typing import Any, Dict, Sequence
+
+class Histogram:
+    """Fixed-bucket histogram; bucket ``le`` counts observations <= that bound"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.bounds = sorted(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound:g}" for bound in self.bounds] + ["le_inf"]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "buckets": dict(zip(labels, self.counts))
+        }
@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from typing import List
+
+import numpy as np
+
+# Set up paths and environment
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from backend.app.config import settings
+from backend.app.database.numpy_vector_store import NumpyVectorStore
+from backend.app.utils.logger import logger
+
+def load_corpus(source: str, synthetic: int, dim: int) -> np.ndarray:
+    """Live vectors of an existing numpy store, or random unit vectors"""
+    if source and os.path.exists(os.path.join(source, "vectors.f32")):
+        store = NumpyVectorStore(source, quantization="none")
+        if store.matrix is not None and store.alive.any():
+            logger.info(f"Benchmarking {int(store.alive.sum())} vectors from {source}")
+            return np.asarray(store.matrix[np.flatnonzero(store.alive)])
+    logger.info(f"No vectors at {source}, benchmarking {synthetic} synthetic {dim}-d vectors")
+    rng = np.random.default_rng(0)
+    # Clustered data resembles sentence embeddings better than isotropic noise
+    centers = rng.normal(size=(64, dim))
+    return (centers[rng.integers(0, 64, synthetic)] + 0.5 * rng.normal(size=(synthetic, dim))).astype(np.float32)
+
+def build(path: str, vectors: np.ndarray, quantization: str, batch_size: int = 5000) -> NumpyVectorStore:
+    store = NumpyVectorStore(path, quantization=quantization)
+    ids = [f"v{i}" for i in range(len(vectors))]
+    for start in range(0, len(vectors), batch_size):
+        end = start + batch_size
+        store.upsert(ids[start:end], vectors[start:end], [""] * len(ids[start:end]), [{}] * len(ids[start:end]))
+    store.optimize()
+    return store
+
+def timed_search(store: NumpyVectorStore, queries: np.ndarray, k: int):
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        rows, _ = store._search(query, k)
+        latencies.append(time.perf_counter() - start)
+        results.append(set(rows.tolist()))
+    return results, latencies
+
+def recall(truth: List[set], found: List[set], k: int) -> float:
+    return float(np.mean([len(t & f) / k for t, f in zip(truth, found)]))
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Compare float32 and int8 numpy vector store search")
+    parser.add_argument("--source", default=os.path.join(settings.DATA_DIR, settings.NUMPY_STORE_DIR, settings.COLLECTION_NAME),
+                        help="Existing numpy store to take vectors from")
+    parser.add_argument("--synthetic", type=int, default=100000, help="Vector count when no store exists")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    vectors = load_corpus(args.source, args.synthetic, args.dim)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+    queries = queries + 0.1 * rng.normal(size=queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    workdir = tempfile.mkdtemp(prefix="quant_bench_")
+    try:
+        exact = build(os.path.join(workdir, "float32"), vectors, "none")
+        quantized = build(os.path.join(workdir, "int8"), vectors, "int8")
+        truth, float_latency = timed_search(exact, queries, args.k)
+
+        rescore = settings.NUMPY_RESCORE_CANDIDATES
+        settings.NUMPY_RESCORE_CANDIDATES = args.k
+        approximate, _ = timed_search(quantized, queries, args.k)
+        settings.NUMPY_RESCORE_CANDIDATES = rescore
+        rescored, int8_latency = timed_search(quantized, queries, args.k)
+
+        float_bytes = os.path.getsize(exact.vectors_path)
+        int8_bytes = os.path.getsize(quantized.codes_path)
+        logger.info(f"Scanned matrix: float32 {float_bytes / 2**20:.1f} MiB, int8 {int8_bytes / 2**20:.1f} MiB "
+                    f"({float_bytes / int8_bytes:.1f}x smaller)")
+        logger.info(f"recall@{args.k}: int8 only {recall(truth, approximate, args.k):.3f}, "
+                    f"int8 + re-score of top {rescore} {recall(truth, rescored, args.k):.3f}")
+        for label, values in (("float32", float_latency), ("int8", int8_latency)):
+            logger.info(f"{label} search: p50={np.percentile(values, 50) * 1000:.2f}ms "
+                        f"p95={np.percentile(values, 95) * 1000:.2f}ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,82 @@
+import sys
+import os
+import time
+import argparse
+import resource
+import statistics
+from typing import List
+
+import numpy as np
+
+# Set up paths and environment
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from backend.app.config import settings
+from backend.app.utils.logger import logger
+
+SAMPLE_TEXTS = [
+    "What is happening in Gaza?",
+    "Latest developments in the war in Ukraine",
+    "Central bank raises interest rates to fight inflation",
+    "Climate summit ends without agreement on fossil fuel phase-out",
+    "The striker scored twice as the home side came back to win 3-2 in extra time.",
+    "Officials said the earthquake, which struck shortly after midnight local time, "
+    "damaged hundreds of buildings and cut power to several towns in the region.",
+    "Shares in the chipmaker fell 8% after it warned that demand from data centres "
+    "would slow in the second half of the year, wiping billions off its market value.",
+    "NASA",
+]
+
+def query_latency(model, texts: List[str], repeats: int) -> float:
+    """Median single-query latency in milliseconds"""
+    samples = []
+    for _ in range(repeats):
+        for text in texts:
+            start = time.perf_counter()
+            model.encode(text, convert_to_numpy=True, show_progress_bar=False)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check that the ONNX embedding backend matches PyTorch, and compare their speed")
+    parser.add_argument("--quantize", action="store_true", help="Check the int8-quantized ONNX graph")
+    parser.add_argument("--min-similarity", type=float, default=None,
+                        help="Minimum cosine similarity per text (default 0.999, or 0.98 quantized)")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args(argv)
+    threshold = args.min_similarity or (0.98 if args.quantize else 0.999)
+
+    from backend.app.services.onnx_embedding import OnnxEmbeddingModel
+    from sentence_transformers import SentenceTransformer
+
+    baseline_rss = rss_mib()
+    onnx_model = OnnxEmbeddingModel(quantize=args.quantize)
+    onnx_rss = rss_mib() - baseline_rss
+    torch_model = SentenceTransformer(settings.EMBEDDING_MODEL)
+    torch_rss = rss_mib() - baseline_rss - onnx_rss
+
+    expected = torch_model.encode(SAMPLE_TEXTS, convert_to_numpy=True, show_progress_bar=False)
+    actual = onnx_model.encode(SAMPLE_TEXTS, convert_to_numpy=True)
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    similarities = np.sum(expected * actual, axis=1)
+    logger.info(f"cosine(torch, onnx{' int8' if args.quantize else ''}): "
+                f"min {similarities.min():.5f}, mean {similarities.mean():.5f}")
+
+    torch_ms = query_latency(torch_model, SAMPLE_TEXTS, args.repeats)
+    onnx_ms = query_latency(onnx_model, SAMPLE_TEXTS, args.repeats)
+    logger.info(f"single-query latency: torch {torch_ms:.2f}ms, onnx {onnx_ms:.2f}ms ({torch_ms / onnx_ms:.1f}x)")
+    logger.info(f"approximate memory added (peak RSS growth): onnx {onnx_rss:.0f} MiB, torch {torch_rss:.0f} MiB")
+
+    if similarities.min() < threshold:
+        logger.error(f"ONNX embeddings diverge from PyTorch: min cosine {similarities.min():.5f} < {threshold}")
+        return 1
+    logger.info("ONNX embeddings match PyTorch")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,50 @@
+import sys
+import os
+import signal
+import asyncio
+import argparse
+import redis
+from typing import List
+
+# Set up paths and environment
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from backend.app.config import settings
+from backend.app.database.vector_store import get_vector_store
+from backend.app.services.embedding_service import EmbeddingWorkerPool
+from backend.app.services.ingestion_daemon import IngestionDaemon
+from backend.app.services.news_service import NewsService
+from backend.app.utils.logger import logger
+
+async def run(args: argparse.Namespace):
+    redis_client = redis.Redis.from_url(settings.REDIS_URL, db=settings.REDIS_DB,
+                                        socket_timeout=10, socket_connect_timeout=5)
+    redis_client.ping()
+    collection = get_vector_store()
+    logger.info(f"Ingesting into {settings.VECTOR_STORE} collection '{settings.COLLECTION_NAME}' "
+                f"({collection.count()} chunks)")
+
+    with EmbeddingWorkerPool(workers=args.workers) as pool:
+        daemon = IngestionDaemon(redis_client, collection, pool, NewsService(full_text=args.full_text))
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, daemon.stop)
+        await daemon.run()
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Poll news feeds continuously and keep the index fresh")
+    parser.add_argument("--workers", type=int, default=settings.INGEST_WORKERS,
+                        help="Embedding worker processes (0 or 1 embeds in-process)")
+    parser.add_argument("--full-text", action="store_true", default=settings.ARTICLE_FULL_TEXT,
+                        help="Fetch each article's page and index the extracted body instead of the feed summary")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run(args))
+        return 0
+    except Exception as e:
+        logger.error(f"Ingestion daemon failed: {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,8 +1,9 @@
 import sys
 import os
+import argparse
 import redis
 import traceback
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 from dotenv import load_dotenv
 
 # Calculate project root (parent of 'scripts' directory)
@@ -21,8 +22,11 @@ load_dotenv(env_path)
 logger.info(f"Loaded .env from: {env_path}")
 
 from backend.app.services.news_service import NewsService
-from backend.app.database.chroma_client import chroma_client
-from backend.app.services.embedding_service import get_embeddings
+from backend.app.database.vector_store import get_vector_store, reset_vector_store
+from backend.app.database.lexical_index import lexical_index
+from backend.app.services.embedding_service import EmbeddingWorkerPool
+from backend.app.services.ingestion_service import IngestionService, article_key
+from backend.app.services.news_feed import RECENT_INDEX_KEY, recent_articles
 from backend.app.config import settings
 
 def validate_article(article: Dict[str, Any]) -> bool:
@@ -45,8 +49,19 @@ def validate_article(article: Dict[str, Any]) -> bool:
     logger.debug(f"Validated article: {article['title']}")
     return True
 
-def initialize_services():
-    """Initialize all required services with robust error handling"""
+def settled_feeds(listings: Dict[str, List[str]], skipped: Set[str], stored_keys: Set[str]) -> List[str]:
+    """Feeds whose every listed article is now stored or had nothing to index"""
+    return [
+        source for source, urls in listings.items()
+        if all(url in skipped or article_key(url) in stored_keys for url in urls)
+    ]
+
+def initialize_services(rebuild: bool = False):
+    """Initialize all required services with robust error handling.
+
+    Incremental runs reuse the existing collection; ``rebuild`` drops it
+    and starts from an empty index.
+    """
     try:
         logger.info("Initializing Redis client...")
         redis_client = redis.Redis(
@@ -59,18 +74,15 @@ def initialize_services():
         redis_client.ping()
         logger.info("Redis initialized successfully")
 
-        logger.info("Initializing ChromaDB collection...")
-        try:
-            chroma_client.delete_collection(name=settings.COLLECTION_NAME)
-            logger.info(f"Deleted ChromaDB collection '{settings.COLLECTION_NAME}'")
-        except Exception as e:
-            if "Collection not found" in str(e):
-                logger.info(f"Collection '{settings.COLLECTION_NAME}' not found, will create a new one")
-            else:
-                logger.warning(f"Error deleting collection: {e}")
-
-        collection = chroma_client.create_collection(name=settings.COLLECTION_NAME)
-        logger.info(f"Created new ChromaDB collection '{settings.COLLECTION_NAME}'")
+        logger.info(f"Initializing {settings.VECTOR_STORE} vector store...")
+        if rebuild:
+            collection = reset_vector_store()
+            logger.info(f"Created new collection '{settings.COLLECTION_NAME}'")
+            lexical_index.reset()
+            logger.info("Cleared lexical index")
+        else:
+            collection = get_vector_store()
+            logger.info(f"Using collection '{settings.COLLECTION_NAME}' for incremental ingestion")
 
         # Verify collection creation
         collection_count = collection.count()
@@ -83,126 +95,92 @@ def initialize_services():
         logger.error(traceback.format_exc())
         raise
 
-def process_chunk(chunk: str, article: Dict[str, Any], collection: Any, chunk_idx: int, article_idx: int) -> bool:
-    """Process a single chunk with comprehensive error handling"""
-    try:
-        if not chunk.strip():
-            logger.debug(f"Skipping empty chunk {chunk_idx} for article {article['title']}")
-            return False
-
-        embedding = get_embeddings(chunk)
-        if embedding is None:
-            logger.error(f"Embedding failed for chunk {chunk_idx} in article {article['title']}")
-            return False
-
-        chunk_id = f"{article['url']}-{chunk_idx}"
-        collection.add(
-            embeddings=[embedding.tolist()],
-            documents=[chunk],
-            metadatas=[{
-                "title": article['title'],
-                "url": article['url'],
-                "published_date": article.get('published_date', ''),
-                "chunk_index": chunk_idx,
-                "article_index": article_idx
-            }],
-            ids=[chunk_id]
-        )
-        logger.debug(f"Stored chunk {chunk_idx} for article {article_idx}: {article['title']}")
-        return True
-
-    except Exception as e:
-        logger.error(f"Chunk processing error for chunk {chunk_idx} in article {article['title']}: {e}")
-        logger.debug(traceback.format_exc())
-        return False
-
-def process_article(article: Dict[str, Any], redis_client: redis.Redis, collection: Any, idx: int) -> int:
-    """Process a single article end-to-end"""
-    if not validate_article(article):
-        logger.warning(f"Skipping article {idx} due to validation failure: {article.get('title', 'Untitled')}")
-        return 0
-
-    try:
-        # Store metadata in Redis
-        redis_key = f"article:{idx}"
-        redis_client.hset(redis_key, mapping={
-            "title": article["title"],
-            "url": article["url"],
-            "published_date": article.get("published_date", ""),
-            "source": article.get("source", "unknown"),
-            "chunk_count": str(len(article['chunks']))
-        })
-        logger.debug(f"Stored article metadata in Redis: {redis_key}")
-
-        # Process chunks and store in ChromaDB
-        successful_chunks = 0
-        for i, chunk in enumerate(article['chunks']):
-            if process_chunk(chunk, article, collection, i, idx):
-                successful_chunks += 1
-            else:
-                logger.warning(f"Failed to process chunk {i} for article {idx}: {article['title']}")
-
-        if successful_chunks == 0:
-            logger.warning(f"No chunks successfully processed for article {idx}: {article['title']}")
-        else:
-            logger.info(f"Processed {successful_chunks}/{len(article['chunks'])} chunks for article {idx}: {article['title']}")
-        return successful_chunks
-
-    except Exception as e:
-        logger.error(f"Article processing failed for article {idx}: {article.get('title', 'Untitled')}: {e}")
-        logger.error(traceback.format_exc())
-        return 0
-
-def main():
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fetch news articles and index them in the vector store")
+    parser.add_argument("--batch-size", type=int, default=settings.INGEST_BATCH_SIZE,
+                        help="Chunks gathered across articles per embedding pass and bulk write")
+    parser.add_argument("--workers", type=int, default=settings.INGEST_WORKERS,
+                        help="Embedding worker processes (0 or 1 embeds in-process)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Drop the collection and Redis data and re-embed everything")
+    parser.add_argument("--prune-missing", action="store_true",
+                        help="Delete articles that no longer appear in any feed")
+    parser.add_argument("--limit", type=int, default=50,
+                        help="Maximum articles taken per run")
+    parser.add_argument("--full-text", action="store_true", default=settings.ARTICLE_FULL_TEXT,
+                        help="Fetch each article's page and index the extracted body instead of the feed summary")
+    parser.add_argument("--retention-days", type=int, default=settings.ARTICLE_RETENTION_DAYS,
+                        help="Delete articles first ingested more than this many days ago (0 keeps all)")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    mode = "rebuild" if args.rebuild else "incremental"
     try:
-        logger.info("Starting news ingestion")
+        logger.info(f"Starting {mode} news ingestion (batch size {args.batch_size}, workers {args.workers})")
         
         # Initialize services
-        redis_client, collection = initialize_services()
+        redis_client, collection = initialize_services(rebuild=args.rebuild)
         
-        # Fetch articles
-        news_service = NewsService()
-        articles = news_service.fetch_articles(limit=50)
+        # Fetch articles. Conditional requests would hide unchanged feeds,
+        # so they are only used when nothing depends on seeing every article.
+        news_service = NewsService(full_text=args.full_text)
+        conditional = not (args.rebuild or args.prune_missing)
+        articles = news_service.fetch_articles(limit=args.limit, conditional=conditional)
         logger.info(f"Fetched {len(articles)} articles")
+        skipped = {article.get("url") for article in articles if not validate_article(article)}
+        articles = [article for article in articles if article.get("url") not in skipped]
         
-        if not articles:
+        if not articles and args.rebuild:
             logger.warning("No articles fetched. Exiting ingestion.")
             return 1
 
-        # Clear existing Redis data
-        redis_client.flushdb()
-        logger.info("Cleared Redis database")
-        
-        # Process all articles
-        total_chunks = 0
-        successful_articles = 0
+        if args.rebuild:
+            # Clear existing Redis data
+            redis_client.flushdb()
+            logger.info("Cleared Redis database")
         
-        for idx, article in enumerate(articles):
-            logger.info(f"\n=== Processing article {idx + 1}/{len(articles)} ===")
-            logger.info(f"Title: {article['title'][:50]}...")
-            
-            chunks_processed = process_article(article, redis_client, collection, idx)
-            if chunks_processed > 0:
-                total_chunks += chunks_processed
-                successful_articles += 1
-
-        # Verify ChromaDB storage
+        with EmbeddingWorkerPool(workers=args.workers) as pool:
+            ingestion = IngestionService(redis_client, collection, pool, batch_size=args.batch_size)
+            ingestion.migrate_records()
+            report = ingestion.ingest(articles, incremental=not args.rebuild)
+        # Keep a feed's new validators only if all its articles are stored. Otherwise the
+        # next conditional fetch would answer 304 and hide the ones that failed or fell past --limit.
+        news_service.commit_feed_state(settled_feeds(news_service.listings, skipped, ingestion.stored_keys))
+
+        current_keys = sources = None
+        if args.prune_missing:
+            # Every article of every feed fetched in full, not just the ones under --limit
+            sources = set(news_service.listings)
+            current_keys = {article_key(url) for urls in news_service.listings.values() for url in urls}
+            unlisted = set(news_service.sources) - sources
+            if unlisted:
+                logger.warning(f"Not pruning missing articles of feeds that failed to fetch: {sorted(unlisted)}")
+        pruned = ingestion.prune(current_keys=current_keys, retention_days=args.retention_days, sources=sources)
+
+        # Build any backend search structures, then verify storage
+        collection.optimize()
         collection_count = collection.count()
-        logger.info(f"Final ChromaDB collection count: {collection_count}")
+        logger.info(f"Final vector store count: {collection_count}")
 
         # Final report
-        stored_articles = redis_client.keys('article:*')
+        stored_count = redis_client.zcard(RECENT_INDEX_KEY)
         logger.info("\n=== INGESTION COMPLETE ===")
         logger.info(f"Total articles fetched: {len(articles)}")
-        logger.info(f"Successfully processed: {successful_articles}")
-        logger.info(f"Total chunks stored in ChromaDB: {total_chunks}")
+        logger.info(f"New or changed articles: {report['updated']}")
+        logger.info(f"Unchanged articles skipped: {report['unchanged']}")
+        logger.info(f"Near-duplicate articles collapsed: {report['duplicates']}")
+        logger.info(f"Expired articles skipped: {report['expired']}")
+        logger.info(f"Failed articles: {report['failed']}")
+        logger.info(f"Chunks embedded and stored: {report['chunks_stored']}")
+        logger.info(f"Stale chunks deleted: {report['chunks_deleted']}")
+        logger.info(f"Articles pruned: {pruned}")
         
         # Verify storage in Redis
-        if stored_articles:
-            logger.info(f"\nFirst 3 articles in Redis:")
-            for key in stored_articles[:3]:
-                data = {k.decode(): v.decode() for k, v in redis_client.hgetall(key).items()}
-                logger.info(f"{key.decode()}: {data}")
+        if stored_count:
+            logger.info(f"\n{stored_count} articles in Redis, newest 3:")
+            for article in recent_articles(redis_client, limit=3)["articles"]:
+                logger.info(f"{article['key']}: {article}")
         else:
             logger.warning("No articles found in Redis after ingestion.")
 
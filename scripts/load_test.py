@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+import random
+import asyncio
+import argparse
+from typing import List
+
+# Set up paths and environment
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+# Default to the offline backend so the RAG path can be exercised without network
+os.environ.setdefault("GENERATION_BACKEND", "stub")
+
+from backend.app.services.embedding_service import embedding_coalescer_stats
+from backend.app.services.rag_service import RAGService
+from backend.app.utils.logger import logger
+
+DEFAULT_QUESTIONS = [
+    "What is happening in Gaza?",
+    "What are the latest developments in Ukraine?",
+    "What happened in the US election?",
+    "Any news about climate change?",
+    "What is the latest on the global economy?",
+]
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+async def run_one(rag_service: RAGService, question: str, first_token: List[float], total: List[float]):
+    start = time.perf_counter()
+    first = None
+    async for _ in rag_service.stream_response(question):
+        if first is None:
+            first = time.perf_counter() - start
+    total.append(time.perf_counter() - start)
+    first_token.append(first if first is not None else total[-1])
+
+async def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Load-test retrieval, caching and streaming in-process")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--unique", action="store_true",
+                        help="Make every question distinct so caches miss and query embeddings coalesce")
+    args = parser.parse_args(argv)
+
+    rag_service = RAGService()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    first_token: List[float] = []
+    total: List[float] = []
+    rng = random.Random(0)
+
+    async def bounded(question: str):
+        async with semaphore:
+            await run_one(rag_service, question, first_token, total)
+
+    start = time.perf_counter()
+    questions = [rng.choice(DEFAULT_QUESTIONS) for _ in range(args.requests)]
+    if args.unique:
+        questions = [f"{question} (request {i})" for i, question in enumerate(questions)]
+    await asyncio.gather(*(bounded(question) for question in questions))
+    elapsed = time.perf_counter() - start
+
+    logger.info(f"Completed {len(total)} requests in {elapsed:.2f}s ({len(total) / elapsed:.1f} req/s)")
+    for label, values in (("time to first token", first_token), ("total latency", total)):
+        logger.info(f"{label}: p50={percentile(values, 50) * 1000:.1f}ms "
+                    f"p95={percentile(values, 95) * 1000:.1f}ms p99={percentile(values, 99) * 1000:.1f}ms")
+    coalescer = embedding_coalescer_stats()
+    logger.info(f"Query embedding batches: {coalescer['batch_size']['count']}, "
+                f"mean size {coalescer['batch_size']['mean']}, mean wait {coalescer['wait_ms']['mean']}ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -0,0 +1,75 @@
+import sys
+import os
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List
+
+# Set up paths and environment
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(project_root)
+
+from backend.app.utils.logger import logger
+
+MODULES = [
+    "backend.app.database",
+    "backend.app.services.embedding_service",
+    "backend.app.services.gemini_service",
+    "backend.app.services.rag_service",
+    "backend.app.main",
+]
+
+IMPORT_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start}}))
+"""
+
+COLD_START_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import backend.app.main
+imported = time.perf_counter() - start
+from backend.app.services.warmup import warm_up
+timings = warm_up()
+print(json.dumps({{"import": imported, "warm_up": timings, "total": time.perf_counter() - start}}))
+"""
+
+def run_probe(code: str) -> Dict:
+    """Run a probe in a fresh interpreter, so nothing is already imported"""
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=project_root)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "probe failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Measure import time and cold start of the API")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per measurement (median reported)")
+    parser.add_argument("--skip-cold-start", action="store_true", help="Only measure module import times")
+    args = parser.parse_args(argv)
+
+    for module in MODULES:
+        try:
+            samples = [run_probe(IMPORT_PROBE.format(root=project_root, module=module))["seconds"]
+                       for _ in range(args.runs)]
+            logger.info(f"import {module}: {statistics.median(samples) * 1000:.0f}ms")
+        except Exception as e:
+            logger.error(f"import {module} failed: {e}")
+
+    if not args.skip_cold_start:
+        try:
+            runs = [run_probe(COLD_START_PROBE.format(root=project_root)) for _ in range(args.runs)]
+            logger.info(f"cold start: import {statistics.median(r['import'] for r in runs):.2f}s, "
+                        f"ready {statistics.median(r['total'] for r in runs):.2f}s")
+            logger.info(f"warm-up steps (last run): {runs[-1]['warm_up']}")
+        except Exception as e:
+            logger.error(f"Cold start measurement failed: {e}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -11,8 +11,10 @@ sys.path.append(project_root)
 env_path = os.path.join(project_root, '.env')
 load_dotenv(env_path)
 
+from backend.app.services.context_builder import build_context
+from backend.app.services.embedding_service import get_query_embedding
 from backend.app.services.rag_service import RAGService
-from backend.app.services.gemini_service import generate_response
+from backend.app.services.gemini_service import stream_response
 from backend.app.utils.logger import logger
 from backend.app.database.redis_client import redis_client
 
@@ -24,19 +26,24 @@ class NewsQueryInterface:
         self.max_history_display = 5  # Limit displayed history entries
         
     async def get_context(self, query: str) -> Optional[str]:
-        """Retrieve relevant context for a query"""
+        """Retrieve relevant context for a query, merged and trimmed to the context budget"""
         try:
-            contexts = self.rag_service.retrieve_context(query, top_k=3)
-            if not contexts:
+            query_embedding = get_query_embedding(query)
+            chunks = self.rag_service.retrieve_chunks(query, top_k=3, query_embedding=query_embedding)
+            if not chunks:
                 logger.warning("No relevant context found for the query in ChromaDB")
                 return None
-            return "\n\n---\n\n".join(contexts)
+            return build_context(query, chunks, query_embedding)
         except Exception as e:
             logger.error(f"Error retrieving context: {e}")
             return None
     
-    async def ask_question(self, question: str) -> str:
-        """Process a question through the RAG pipeline"""
+    async def ask_question(self, question: str, on_token=None) -> str:
+        """Process a question through the RAG pipeline.
+
+        Tokens are passed to ``on_token`` as they arrive from the model; the
+        complete response is returned once generation finishes.
+        """
         if not question.strip():
             return "Please enter a valid question."
             
@@ -47,9 +54,21 @@ class NewsQueryInterface:
         if not context:
             return "I couldn't find any relevant news articles in the database to answer your question. Please ensure articles have been ingested using ingest_news.py."
         
-        # Generate response using Gemini with a timeout
+        # Stream the response from Gemini with an overall timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 30.0
+        stream = stream_response(question, context)
+        parts = []
         try:
-            response = await asyncio.wait_for(generate_response(question, context), timeout=30.0)
+            while True:
+                try:
+                    token = await asyncio.wait_for(stream.__anext__(), timeout=max(0.0, deadline - loop.time()))
+                except StopAsyncIteration:
+                    break
+                parts.append(token)
+                if on_token:
+                    on_token(token)
+            response = "".join(parts).strip()
             self.chat_history.append({"question": question, "response": response})
             return response
         except asyncio.TimeoutError:
@@ -96,9 +115,18 @@ async def main():
                 print("Please enter a question.")
                 continue
                 
-            response = await interface.ask_question(question)
             print("\nResponse:")
-            print(response)
+            streamed = []
+
+            def print_token(token: str):
+                streamed.append(token)
+                print(token, end="", flush=True)
+
+            response = await interface.ask_question(question, on_token=print_token)
+            if streamed:
+                print()
+            if response != "".join(streamed).strip():
+                print(response)
             
         except KeyboardInterrupt:
             print("\nSession ended by user.")
@@ -14,26 +14,15 @@ print(f"GEMINI_API_KEY present: {'GEMINI_API_KEY' in os.environ}")
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.app.database.chroma_client import chroma_client
+from backend.app.database.vector_store import reset_vector_store
 from backend.app.config import settings
 from backend.app.utils.logger import logger
 
 def setup_collection(collection_name: str) -> bool:
-    """Initialize or reset the ChromaDB collection"""
+    """Initialize or reset the vector store collection"""
     try:
-        # Delete collection if exists
-        try:
-            chroma_client.delete_collection(name=collection_name)
-            logger.info(f"Deleted existing collection '{collection_name}'")
-        except Exception as e:
-            if "Collection not found" not in str(e):
-                logger.warning(f"Delete error: {e}")
-            else:
-                logger.info("No existing collection to delete")
-        
-        # Create new collection
-        chroma_client.create_collection(name=collection_name)
-        logger.info(f"Created collection '{collection_name}'")
+        reset_vector_store(collection_name)
+        logger.info(f"Created collection '{collection_name}' in {settings.VECTOR_STORE} vector store")
         return True
     except Exception as e:
         logger.error(f"Setup error: {e}")